@@ -16,15 +16,60 @@ app.use(cors({
 
 app.use(express.json());
 
+// FastAPI 는 user_id 쿼리를 JWT 보다 먼저 믿기 때문에, 게이트웨이에서는 허용한 파라미터만 넘긴다.
+const FORWARDED_PARAMS = ['stream', 'plant_name', 'address'];
+
+function forwardedParams(query) {
+    const params = {};
+    for (const key of FORWARDED_PARAMS) {
+        if (query[key] !== undefined) {
+            params[key] = query[key];
+        }
+    }
+    return params;
+}
+
 app.get('/precommend/plant-care', async (req, res) => {
     const token = req.headers.authorization;
     console.log("프론트에서 받은 Authorization 헤더:", token);
 
+    if (req.query.stream === 'true' || req.query.stream === '1') {
+        try {
+            const upstream = await axios.get(`${FASTAPI_SERVICE_URL}/precommend/plant-care`, {
+                headers: {
+                    Authorization: token,
+                },
+                params: forwardedParams(req.query),
+                responseType: 'stream',
+                timeout: 120000
+            });
+            res.status(upstream.status);
+            res.setHeader('Content-Type', 'text/event-stream; charset=utf-8');
+            res.setHeader('Cache-Control', 'no-cache');
+            res.setHeader('X-Accel-Buffering', 'no');
+            res.flushHeaders();
+            upstream.data.on('error', (error) => {
+                console.error("FastAPI 스트리밍 중 연결 오류:", error.message);
+                res.end();
+            });
+            upstream.data.pipe(res);
+            req.on('close', () => upstream.data.destroy());
+        } catch (error) {
+            console.error("FastAPI 스트리밍 응답 오류:", error.message);
+            res.status(error.response?.status || 502).json({
+                message: 'FastAPI 스트리밍 연결 실패',
+                error: error.message,
+            });
+        }
+        return;
+    }
+
     try {
         const response = await axios.get(`${FASTAPI_SERVICE_URL}/precommend/plant-care`, {
             headers: {
                 Authorization: token,
             },
+            params: forwardedParams(req.query),
             timeout: 120000
         });
         res.status(response.status).json(response.data);
@@ -0,0 +1,128 @@
+import argparse
+import asyncio
+import json
+from collections import defaultdict
+from typing import Dict, List
+
+import main
+
+USERS_WITH_PLANTS_SQL = """
+    SELECT u.user_id, u.address, x.plant_name, x.source
+    FROM users u
+    JOIN (
+        SELECT rp.user_id, rp.plant_name, 0 AS source
+        FROM user_report_plants rp
+        UNION ALL
+        SELECT up.user_id, p.plant_name, 1 AS source
+        FROM user_plants up
+        JOIN plants p ON up.plant_id = p.plant_id
+    ) x ON x.user_id = u.user_id
+    WHERE u.address IS NOT NULL
+      AND u.address <> ''
+    ORDER BY u.user_id, x.source, x.plant_name
+"""
+
+
+def group_user_plants(rows: List[dict]) -> Dict[int, dict]:
+    # list_my_plants 와 같은 규칙: 성장 리포트의 식물이 있으면 그것만, 없으면 user_plants 를 쓴다.
+    users: Dict[int, dict] = {}
+    for row in rows:
+        user = users.setdefault(row["user_id"], {"address": row["address"], "source": row["source"], "plants": []})
+        if row["source"] == user["source"]:
+            user["plants"].append(row["plant_name"])
+    return users
+
+
+def chunked(items: List[str], size: int):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+async def run(concurrency: int, chunk_size: int):
+    rows = await main.db_pool.afetchall(USERS_WITH_PLANTS_SQL)
+    users = group_user_plants(rows)
+    await main.get_plant_catalog()
+    semaphore = asyncio.Semaphore(concurrency)
+    stats = defaultdict(int)
+
+    async def geocode(address: str):
+        async with semaphore:
+            try:
+                return await main.get_lat_lon_from_address(address)
+            except Exception as e:
+                stats["geocode_failed"] += 1
+                print(f"[Batch] 주소 변환 실패 {address}: {e}")
+                return None
+
+    addresses = sorted({u["address"] for u in users.values()})
+    coords = dict(zip(addresses, await asyncio.gather(*(geocode(a) for a in addresses))))
+
+    cells: Dict[tuple, List[int]] = defaultdict(list)
+    for user_id, user in users.items():
+        if coords.get(user["address"]) is not None:
+            cells[main.weather_cell(*coords[user["address"]])].append(user_id)
+
+    async def process_cell(cell, user_ids: List[int]):
+        lat, lon = coords[users[user_ids[0]]["address"]]
+        try:
+            async with semaphore:
+                weather_info = await main.get_weather_info(lat, lon)
+        except Exception as e:
+            stats["weather_failed"] += 1
+            print(f"[Batch] 날씨 조회 실패 {cell}: {e}")
+            return
+        advice_weather = {"temperature": weather_info["temperature"], "weather": weather_info["weather"]}
+
+        # 셀 안의 사용자들이 가진 식물을 중복 없이 모아 먼저 생성하면, 사용자별 호출은 캐시에서 채워진다.
+        unique_plants = list(dict.fromkeys(p for uid in user_ids for p in users[uid]["plants"]))
+
+        async def warm(names: List[str]):
+            async with semaphore:
+                try:
+                    await main.generate_batch_care_advice(names, advice_weather)
+                except Exception as e:
+                    stats["advice_failed"] += 1
+                    print(f"[Batch] 관리 조언 생성 실패 {cell}: {e}")
+
+        await asyncio.gather(*(warm(names) for names in chunked(unique_plants, chunk_size)))
+
+        for uid in user_ids:
+            user = users[uid]
+            try:
+                advices = await main.generate_batch_care_advice(user["plants"], advice_weather)
+            except Exception as e:
+                stats["advice_failed"] += 1
+                print(f"[Batch] 사용자 {uid} 관리 조언 생성 실패: {e}")
+                continue
+            payload = main.build_care_payload(user["address"], weather_info, advices)
+            await main.db_pool.aexecute("""
+                INSERT INTO plant_care_results (user_id, address, payload, generated_at)
+                VALUES (%s, %s, %s, NOW())
+                ON DUPLICATE KEY UPDATE
+                    address = VALUES(address),
+                    payload = VALUES(payload),
+                    generated_at = VALUES(generated_at)
+            """, (uid, user["address"], json.dumps(payload, ensure_ascii=False)))
+            stats["stored"] += 1
+
+    try:
+        await asyncio.gather(*(process_cell(cell, ids) for cell, ids in cells.items()))
+    finally:
+        await main.close_http_clients()
+        main.db_pool.close()
+    print(
+        f"[Batch] 사용자 {len(users)}명, 날씨 셀 {len(cells)}개, 저장 {stats['stored']}건, "
+        f"실패(주소 {stats['geocode_failed']}, 날씨 {stats['weather_failed']}, 조언 {stats['advice_failed']})"
+    )
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="모든 사용자의 오늘 식물 관리 조언을 지역별로 묶어 미리 생성합니다.")
+    parser.add_argument("--concurrency", type=int, default=4, help="동시에 실행할 외부 API 호출 수")
+    parser.add_argument("--chunk-size", type=int, default=10, help="한 번의 OpenAI 호출에 넣을 식물 수")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    asyncio.run(run(args.concurrency, args.chunk_size))
@@ -0,0 +1,75 @@
+import asyncio
+import os
+import random
+import time
+from typing import Any, Optional, Sequence
+
+import main
+from bench.fakes import DISTRICTS, PLANT_NAMES
+
+
+# MySQL 대신 쓰는 메모리 DB. main.py 가 보내는 쿼리를 종류별로 구분해 흉내 낸다.
+class FakeDbPool:
+    def __init__(self, users: int, latency_ms: float, seed: int = 7):
+        rng = random.Random(seed)
+        self.latency = latency_ms / 1000
+        self.users = {}
+        for user_id in range(1, users + 1):
+            self.users[user_id] = {
+                "address": DISTRICTS[user_id % len(DISTRICTS)],
+                "reports": sorted(rng.sample(PLANT_NAMES, rng.randint(1, 5))),
+                "owned": [],
+            }
+
+    def _query(self, sql: str, args: Optional[Sequence[Any]]):
+        if self.latency:
+            time.sleep(self.latency)
+        user = self.users.get(args[-1]) if args else None
+        if "plant_care_results" in sql or sql.lstrip().upper().startswith(("UPDATE", "INSERT", "DELETE")):
+            return []
+        if "FROM plant_aliases" in sql:
+            return [{"plant_id": PLANT_NAMES.index("몬스테라") + 1, "alias": "monstera"}]
+        if "FROM plants" in sql:
+            return [{"plant_id": i, "plant_name": name} for i, name in enumerate(PLANT_NAMES, 1)]
+        if "FROM users u" in sql:
+            if user is None:
+                return []
+            rows = [{"address": user["address"], "plant_name": p, "source": 0} for p in user["reports"]]
+            return rows or [{"address": user["address"], "plant_name": None, "source": None}]
+        if "user_report_plants" in sql:
+            user = user or {}
+            if user.get("reports"):
+                return [{"plant_name": p, "source": 0} for p in user["reports"]]
+            return [{"plant_name": p, "source": 1} for p in user.get("owned", [])]
+        return []
+
+    def fetchall(self, sql: str, args: Optional[Sequence[Any]] = None) -> list:
+        return self._query(sql, args)
+
+    def fetchone(self, sql: str, args: Optional[Sequence[Any]] = None) -> Optional[dict]:
+        rows = self._query(sql, args)
+        return rows[0] if rows else None
+
+    def execute(self, sql: str, args: Optional[Sequence[Any]] = None) -> int:
+        self._query(sql, args)
+        return 1
+
+    async def afetchall(self, sql: str, args: Optional[Sequence[Any]] = None) -> list:
+        return await asyncio.to_thread(self.fetchall, sql, args)
+
+    async def afetchone(self, sql: str, args: Optional[Sequence[Any]] = None) -> Optional[dict]:
+        return await asyncio.to_thread(self.fetchone, sql, args)
+
+    async def aexecute(self, sql: str, args: Optional[Sequence[Any]] = None) -> int:
+        return await asyncio.to_thread(self.execute, sql, args)
+
+    def close(self):
+        pass
+
+
+main.db_pool = FakeDbPool(
+    users=int(os.getenv("BENCH_USERS", "200")),
+    latency_ms=float(os.getenv("BENCH_DB_LATENCY_MS", "2")),
+)
+
+app = main.app
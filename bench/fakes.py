@@ -0,0 +1,257 @@
+import argparse
+import asyncio
+import hashlib
+import io
+import json
+import math
+import random
+import re
+import time
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+UPSTREAMS = ("openai", "kakao", "weather", "cse", "image")
+
+DEFAULT_LATENCY_MS = {"openai": 1500, "kakao": 40, "weather": 60, "cse": 300, "image": 120}
+
+PLANT_NAMES = [
+    "몬스테라", "스투키", "스킨답서스", "금전수", "산세베리아", "고무나무", "테이블야자",
+    "스파티필룸", "아이비", "행운목", "필레아 페페로미오이데스", "칼라데아", "올리브나무",
+    "떡갈고무나무", "아레카야자", "호야", "디펜바키아", "여인초", "알로카시아", "틸란드시아",
+]
+
+DISTRICTS = [
+    "서울 강남구 테헤란로 1", "서울 마포구 월드컵북로 2", "서울 송파구 올림픽로 3", "서울 종로구 세종대로 4",
+    "서울 관악구 관악로 5", "서울 노원구 동일로 6", "경기 성남시 분당구 판교역로 7", "경기 수원시 팔달구 효원로 8",
+    "인천 연수구 컨벤시아대로 9", "경기 고양시 일산동구 중앙로 10",
+]
+
+
+# 지연 시간은 로그정규분포(중앙값 median_ms)로 뽑고, error_rate 확률로 오류를 낸다.
+class UpstreamProfile:
+    def __init__(self, median_ms: float, sigma: float, error_rate: float):
+        self.median_ms = median_ms
+        self.sigma = sigma
+        self.error_rate = error_rate
+
+    def sample_seconds(self) -> float:
+        if self.median_ms <= 0:
+            return 0.0
+        return random.lognormvariate(math.log(self.median_ms), self.sigma) / 1000
+
+    def should_fail(self) -> bool:
+        return random.random() < self.error_rate
+
+
+def _stable_fraction(text: str) -> float:
+    return int(hashlib.sha1(text.encode("utf-8")).hexdigest()[:8], 16) / 0xFFFFFFFF
+
+
+def _error_response(status_code: int = 500):
+    return JSONResponse({"error": {"message": "bench injected error", "type": "server_error"}}, status_code)
+
+
+def openai_app(profile: UpstreamProfile) -> Starlette:
+    async def chat_completions(request: Request):
+        body = await request.json()
+        total = profile.sample_seconds()
+        if profile.should_fail():
+            await asyncio.sleep(total * 0.1)
+            return JSONResponse(
+                {"error": {"message": "Rate limit reached (bench)", "type": "rate_limit_error"}},
+                status_code=429,
+                headers={"Retry-After": "1"},
+            )
+
+        prompt = body["messages"][-1]["content"]
+        if body.get("tools"):
+            picks = random.sample(PLANT_NAMES, 3)
+            arguments = json.dumps(
+                {"recommendations": [{"name": n, "description": f"{n}은(는) 키우기 쉬운 실내 식물입니다."} for n in picks]},
+                ensure_ascii=False,
+            )
+            content = None
+        else:
+            match = re.search(r"다음 식물들 '([^']*)'", prompt)
+            names = match.group(1).split(", ") if match else []
+            arguments = None
+            content = json.dumps(
+                {"care_advice": [{"plant": n, "advice": f"오늘은 {n}의 흙 상태를 확인하고 통풍을 시켜 주세요."} for n in names]},
+                ensure_ascii=False,
+            )
+        completion_tokens = len(arguments or content) // 2
+        usage = {"prompt_tokens": len(prompt) // 2, "completion_tokens": completion_tokens,
+                 "total_tokens": len(prompt) // 2 + completion_tokens}
+        created = int(time.time())
+
+        if not body.get("stream"):
+            await asyncio.sleep(total)
+            message = {"role": "assistant", "content": content}
+            if arguments is not None:
+                message["tool_calls"] = [{
+                    "id": "call_bench", "type": "function",
+                    "function": {"name": "recommend_plants", "arguments": arguments},
+                }]
+            return JSONResponse({
+                "id": "chatcmpl-bench", "object": "chat.completion", "created": created, "model": body["model"],
+                "choices": [{"index": 0, "message": message, "finish_reason": "stop"}],
+                "usage": usage,
+            })
+
+        text = arguments if arguments is not None else content
+        pieces = [text[i:i + 8] for i in range(0, len(text), 8)]
+
+        def chunk(delta, finish_reason=None, with_usage=False):
+            data = {
+                "id": "chatcmpl-bench", "object": "chat.completion.chunk", "created": created,
+                "model": body["model"],
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            }
+            if with_usage:
+                data["usage"] = usage
+            return f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+        async def events():
+            await asyncio.sleep(total * 0.15)
+            per_piece = total * 0.85 / max(len(pieces), 1)
+            for i, piece in enumerate(pieces):
+                if arguments is not None:
+                    call = {"index": 0, "function": {"arguments": piece}}
+                    if i == 0:
+                        call.update({"id": "call_bench", "type": "function"})
+                        call["function"]["name"] = "recommend_plants"
+                    yield chunk({"tool_calls": [call]})
+                else:
+                    yield chunk({"content": piece})
+                await asyncio.sleep(per_piece)
+            yield chunk({}, finish_reason="stop", with_usage=True)
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return Starlette(routes=[Route("/v1/chat/completions", chat_completions, methods=["POST"])])
+
+
+def kakao_app(profile: UpstreamProfile) -> Starlette:
+    async def search(request: Request):
+        await asyncio.sleep(profile.sample_seconds())
+        if profile.should_fail():
+            return _error_response()
+        query = request.query_params.get("query", "")
+        f = _stable_fraction(query)
+        return JSONResponse({"documents": [{"y": str(37.45 + f * 0.2), "x": str(126.85 + f * 0.3)}]})
+
+    return Starlette(routes=[Route("/v2/local/search/address.json", search)])
+
+
+def weather_app(profile: UpstreamProfile) -> Starlette:
+    async def weather(request: Request):
+        await asyncio.sleep(profile.sample_seconds())
+        if profile.should_fail():
+            return _error_response()
+        f = _stable_fraction(request.query_params.get("lat", "") + request.query_params.get("lon", ""))
+        return JSONResponse({
+            "name": "Seoul",
+            "weather": [{"description": random.choice(["맑음", "구름 조금", "흐림", "약한 비"])}],
+            "main": {"temp": round(5 + f * 25, 1), "feels_like": round(4 + f * 25, 1), "humidity": 40 + int(f * 50)},
+            "wind": {"speed": round(f * 6, 1), "deg": int(f * 360)},
+            "clouds": {"all": int(f * 100)},
+        })
+
+    return Starlette(routes=[Route("/data/2.5/weather", weather)])
+
+
+def cse_app(profile: UpstreamProfile, image_base: str) -> Starlette:
+    async def search(request: Request):
+        await asyncio.sleep(profile.sample_seconds())
+        if profile.should_fail():
+            return _error_response()
+        digest = hashlib.sha1(request.query_params.get("q", "").encode("utf-8")).hexdigest()[:12]
+        return JSONResponse({"items": [{"link": f"{image_base}/img/{digest}.jpg"}]})
+
+    return Starlette(routes=[Route("/customsearch/v1", search)])
+
+
+def _make_image(target_bytes: int) -> bytes:
+    try:
+        from PIL import Image
+    except ImportError:
+        return b"\xff\xd8\xff\xe0" + random.randbytes(max(target_bytes - 6, 0)) + b"\xff\xd9"
+    side = max(int(math.sqrt(target_bytes / 1.5)), 16)
+    image = Image.frombytes("RGB", (side, side), random.randbytes(side * side * 3))
+    out = io.BytesIO()
+    image.save(out, format="JPEG", quality=90)
+    return out.getvalue()
+
+
+def image_app(profile: UpstreamProfile, image_bytes: int) -> Starlette:
+    body = _make_image(image_bytes)
+
+    async def image(request: Request):
+        await asyncio.sleep(profile.sample_seconds())
+        if profile.should_fail():
+            return Response(status_code=503)
+        return Response(body, media_type="image/jpeg")
+
+    return Starlette(routes=[Route("/img/{name}", image)])
+
+
+def parse_overrides(values, cast=float):
+    overrides = {}
+    for value in values or []:
+        name, _, amount = value.partition("=")
+        if name not in UPSTREAMS:
+            raise SystemExit(f"알 수 없는 업스트림: {name} (가능: {', '.join(UPSTREAMS)})")
+        overrides[name] = cast(amount)
+    return overrides
+
+
+def upstream_ports(base_port: int):
+    return {name: base_port + i for i, name in enumerate(UPSTREAMS)}
+
+
+async def serve(host: str, base_port: int, latency: dict, errors: dict, sigma: float, image_bytes: int):
+    ports = upstream_ports(base_port)
+    profiles = {
+        name: UpstreamProfile(latency.get(name, DEFAULT_LATENCY_MS[name]), sigma, errors.get(name, 0.0))
+        for name in UPSTREAMS
+    }
+    apps = {
+        "openai": openai_app(profiles["openai"]),
+        "kakao": kakao_app(profiles["kakao"]),
+        "weather": weather_app(profiles["weather"]),
+        "cse": cse_app(profiles["cse"], f"http://{host}:{ports['image']}"),
+        "image": image_app(profiles["image"], image_bytes),
+    }
+    servers = [
+        uvicorn.Server(uvicorn.Config(apps[name], host=host, port=ports[name], log_level="warning"))
+        for name in UPSTREAMS
+    ]
+    await asyncio.gather(*(server.serve() for server in servers))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="벤치마크용 로컬 가짜 업스트림 서버들을 실행합니다.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--base-port", type=int, default=18100)
+    parser.add_argument("--latency", action="append", help="업스트림별 중앙 지연(ms), 예: openai=1500")
+    parser.add_argument("--error-rate", action="append", help="업스트림별 오류 확률, 예: openai=0.05")
+    parser.add_argument("--sigma", type=float, default=0.35, help="로그정규 지연 분포의 sigma")
+    parser.add_argument("--image-bytes", type=int, default=300_000, help="가짜 이미지 크기")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    asyncio.run(serve(
+        args.host,
+        args.base_port,
+        parse_overrides(args.latency),
+        parse_overrides(args.error_rate),
+        args.sigma,
+        args.image_bytes,
+    ))
@@ -0,0 +1,236 @@
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List
+from urllib.parse import quote
+
+import httpx
+
+from bench.fakes import DISTRICTS, upstream_ports
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, "bench", "results")
+SCENARIOS = ("recommend", "plant-care", "proxy-image", "weather")
+
+
+def wait_for_port(host: str, port: int, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection((host, port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"{host}:{port} 가 {timeout}초 안에 열리지 않았습니다.")
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(int(round(pct / 100 * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+def build_request_factory(scenario: str, distinct: int, image_base: str) -> Callable[[random.Random], dict]:
+    combos = list(itertools.product((False, True), (False, True), (False, True), (False, True),
+                                    ("Indoor", "Window", "Balcony"), (False, True), (1, 2, 3, 4)))
+    combos = combos[:max(distinct, 1)]
+
+    def recommend(rng):
+        s, n, e, w, location, blinds, water = rng.choice(combos)
+        return {"method": "POST", "url": "/precommend/recommend", "json": {
+            "has_south_sun": s, "has_north_sun": n, "has_east_sun": e, "has_west_sun": w,
+            "plant_location": location, "has_blinds_curtains": blinds, "water_frequency": water,
+        }}
+
+    def plant_care(rng):
+        return {"method": "GET", "url": "/precommend/plant-care", "params": {"user_id": rng.randint(1, distinct)}}
+
+    def proxy_image(rng):
+        url = f"{image_base}/img/bench-{rng.randint(1, distinct)}.jpg"
+        return {"method": "GET", "url": f"/proxy-image?url={quote(url, safe='')}"}
+
+    def weather(rng):
+        return {"method": "GET", "url": "/weather",
+                "params": {"address": DISTRICTS[rng.randrange(min(distinct, len(DISTRICTS)))]}}
+
+    return {"recommend": recommend, "plant-care": plant_care, "proxy-image": proxy_image, "weather": weather}[scenario]
+
+
+async def run_level(base_url: str, factory, concurrency: int, duration: float, seed: int) -> dict:
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits) as client:
+        deadline = time.monotonic() + duration
+
+        async def worker(worker_id: int):
+            rng = random.Random(seed * 1000 + worker_id)
+            while time.monotonic() < deadline:
+                request = factory(rng)
+                start = time.perf_counter()
+                try:
+                    response = await client.request(**request)
+                    await response.aread()
+                    key = str(response.status_code)
+                except httpx.HTTPError as e:
+                    key = type(e).__name__
+                latencies.append(time.perf_counter() - start)
+                statuses[key] = statuses.get(key, 0) + 1
+
+        started = time.monotonic()
+        await asyncio.gather(*(worker(i) for i in range(concurrency)))
+        elapsed = time.monotonic() - started
+
+    ordered = sorted(latencies)
+    ok = sum(v for k, v in statuses.items() if k.startswith("2") or k == "304")
+    return {
+        "requests": len(latencies),
+        "ok": ok,
+        "statuses": statuses,
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(percentile(ordered, 50) * 1000, 1),
+        "p95_ms": round(percentile(ordered, 95) * 1000, 1),
+        "p99_ms": round(percentile(ordered, 99) * 1000, 1),
+    }
+
+
+def print_report(results: dict, baseline: dict = None):
+    header = f"{'scenario':<12} {'conc':>5} {'req':>6} {'ok%':>6} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8}"
+    print(header)
+    print("-" * len(header))
+    for scenario, levels in results.items():
+        for concurrency, r in levels.items():
+            ok_pct = 100 * r["ok"] / r["requests"] if r["requests"] else 0
+            line = (f"{scenario:<12} {concurrency:>5} {r['requests']:>6} {ok_pct:>5.1f}% "
+                    f"{r['throughput_rps']:>8.1f} {r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} {r['p99_ms']:>8.1f}")
+            base = (baseline or {}).get(scenario, {}).get(concurrency)
+            if base:
+                line += (f"   vs base: rps {r['throughput_rps'] - base['throughput_rps']:+.1f}, "
+                         f"p99 {r['p99_ms'] - base['p99_ms']:+.1f}ms")
+            print(line)
+
+
+def start_processes(args, cache_dir: str):
+    ports = upstream_ports(args.fake_base_port)
+    fake_cmd = [sys.executable, "-m", "bench.fakes", "--host", args.host, "--base-port", str(args.fake_base_port),
+                "--sigma", str(args.sigma), "--image-bytes", str(args.image_bytes)]
+    for value in args.latency or []:
+        fake_cmd += ["--latency", value]
+    for value in args.error_rate or []:
+        fake_cmd += ["--error-rate", value]
+    fakes = subprocess.Popen(fake_cmd, cwd=ROOT)
+    for port in ports.values():
+        wait_for_port(args.host, port)
+
+    base = f"http://{args.host}"
+    env = dict(
+        os.environ,
+        OPENAI_API_KEY="bench",
+        OPENAI_BASE_URL=f"{base}:{ports['openai']}/v1",
+        KAKAO_REST_API_KEY="bench",
+        KAKAO_GEOCODE_URL=f"{base}:{ports['kakao']}/v2/local/search/address.json",
+        OPENWEATHER_API_KEY="bench",
+        OPENWEATHER_URL=f"{base}:{ports['weather']}/data/2.5/weather",
+        GOOGLE_API_KEY="bench",
+        GOOGLE_CSE_ID="bench",
+        GOOGLE_CSE_URL=f"{base}:{ports['cse']}/customsearch/v1",
+        JWT_SECRET_KEY="bench",
+        CACHE_DIR=cache_dir,
+        BENCH_USERS=str(args.distinct),
+        BENCH_DB_LATENCY_MS=str(args.db_latency_ms),
+    )
+    app = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "bench.app_server:app", "--host", args.host, "--port", str(args.app_port),
+         "--workers", str(args.workers), "--log-level", "warning"],
+        cwd=ROOT, env=env,
+    )
+    wait_for_port(args.host, args.app_port, timeout=60)
+    return fakes, app, f"{base}:{ports['image']}"
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="가짜 업스트림을 붙여 FastAPI 앱의 처리량과 지연 시간을 측정합니다.")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help=f"쉼표로 구분 ({', '.join(SCENARIOS)})")
+    parser.add_argument("--concurrency", default="1,8,32", help="쉼표로 구분한 동시 요청 수 목록")
+    parser.add_argument("--duration", type=float, default=10, help="동시성 단계마다 측정할 시간(초)")
+    parser.add_argument("--distinct", type=int, default=50, help="요청 키(사용자, 이미지, 환경 조합)의 가짓수")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn 워커 수")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--app-port", type=int, default=18000)
+    parser.add_argument("--fake-base-port", type=int, default=18100)
+    parser.add_argument("--latency", action="append", help="업스트림별 중앙 지연(ms), 예: openai=1500")
+    parser.add_argument("--error-rate", action="append", help="업스트림별 오류 확률, 예: openai=0.05")
+    parser.add_argument("--sigma", type=float, default=0.35)
+    parser.add_argument("--image-bytes", type=int, default=300_000)
+    parser.add_argument("--db-latency-ms", type=float, default=2)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="결과 JSON 경로 (기본: bench/results/<commit>.json)")
+    parser.add_argument("--baseline", help="비교할 이전 결과 JSON 경로")
+    return parser.parse_args(argv)
+
+
+async def drive(args, base_url: str, image_base: str) -> dict:
+    results: Dict[str, Dict[str, dict]] = {}
+    for scenario in args.scenarios.split(","):
+        factory = build_request_factory(scenario, args.distinct, image_base)
+        results[scenario] = {}
+        for concurrency in (int(c) for c in args.concurrency.split(",")):
+            results[scenario][str(concurrency)] = await run_level(
+                base_url, factory, concurrency, args.duration, args.seed
+            )
+    return results
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    cache_dir = tempfile.mkdtemp(prefix="plantmate-bench-")
+    fakes = app = None
+    try:
+        fakes, app, image_base = start_processes(args, cache_dir)
+        results = asyncio.run(drive(args, f"http://{args.host}:{args.app_port}", image_base))
+    finally:
+        for proc in (app, fakes):
+            if proc is not None:
+                proc.terminate()
+                proc.wait(timeout=10)
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+    print_report(results, baseline)
+
+    commit = git_commit()
+    output = args.output or os.path.join(RESULTS_DIR, f"{commit}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump({
+            "commit": commit,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "config": {k: v for k, v in vars(args).items() if k not in ("output", "baseline")},
+            "results": results,
+        }, f, ensure_ascii=False, indent=2)
+    print(f"결과 저장: {output}")
+
+
+if __name__ == "__main__":
+    main()
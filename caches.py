@@ -0,0 +1,99 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class LRUCache:
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        item = self._data.get(key)
+        if item is None:
+            return default
+        value, expires_at = item
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._data[key]
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        self._data[key] = (value, expires_at)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def delete(self, key: Hashable):
+        self._data.pop(key, None)
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+# 프로세스 재시작 후에도 유지되는 JSON 키-값 저장소
+class SqliteStore:
+    def __init__(self, path: str, table: str):
+        self.path = path
+        self.table = table
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, updated_at REAL NOT NULL)"
+        )
+
+    def get(self, key: str, max_age: Optional[float] = None) -> Any:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT value, updated_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        if max_age is not None and row[1] + max_age <= time.time():
+            return None
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Any):
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, updated_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), time.time()),
+            )
+
+    def delete(self, key: str):
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+
+    # 이벤트 루프에서는 아래 두 메서드를 쓴다. 파일을 여러 워커가 함께 쓰므로 다른 워커가 쓰기 락을 쥐고 있으면
+    # 최대 busy timeout 만큼 기다릴 수 있다. 캐시 용도라 실패하면 로그만 남기고 없는 것으로 본다.
+    async def aget(self, key: str, max_age: Optional[float] = None) -> Any:
+        try:
+            return await asyncio.to_thread(self.get, key, max_age)
+        except sqlite3.Error as e:
+            print(f"[Store] {self.table} 조회 실패: {e}")
+            return None
+
+    async def aset(self, key: str, value: Any) -> bool:
+        try:
+            await asyncio.to_thread(self.set, key, value)
+        except sqlite3.Error as e:
+            print(f"[Store] {self.table} 저장 실패: {e}")
+            return False
+        return True
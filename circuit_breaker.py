@@ -0,0 +1,146 @@
+import time
+from typing import Callable, Optional, Tuple, Type
+
+from metrics import Counter, Gauge
+
+CIRCUIT_STATE = Gauge("plantmate_circuit_state", "회로 차단기 상태 (0=closed, 1=half_open, 2=open)", ("circuit",))
+CIRCUIT_REJECTED = Counter("plantmate_circuit_rejected_total", "차단기가 열려 바로 거절한 호출 수", ("circuit",))
+
+CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitOpen(Exception):
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"{name} 서비스가 일시적으로 응답하지 않습니다. 잠시 후 다시 시도해 주세요.")
+        self.name = name
+        self.retry_after = retry_after
+
+
+# 연속 실패가 failure_threshold 번 쌓이면 열려서 상류를 부르지 않고 바로 CircuitOpen 을 던진다.
+# reset_timeout 이 지나면 half_open 상태에서 시험 호출을 보내 성공하면 닫고, 실패하면 다시 연다.
+class CircuitBreaker:
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        half_open_probes: int = 1,
+        ignore: Tuple[Type[BaseException], ...] = (),
+        is_failure: Optional[Callable[[BaseException], bool]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_probes = half_open_probes
+        # 주소를 찾지 못했거나 이쪽에서 요청을 덜어낸 경우처럼 상류 장애가 아닌 예외는
+        # 성공도 실패도 아닌 것으로 보고, half_open 의 시험 자리만 돌려준다.
+        self.ignore = ignore
+        # 예외 종류만으로 가를 수 없을 때(4xx 와 5xx 가 같은 예외 타입인 경우) 실패로 셀지 직접 고른다.
+        self.is_failure = is_failure
+        self._clock = clock
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        CIRCUIT_STATE.set(0, circuit=name)
+
+    @property
+    def state(self) -> str:
+        if self._state == OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+            self._set_state(HALF_OPEN)
+            self._probes = 0
+        return self._state
+
+    def _set_state(self, state: str):
+        self._state = state
+        CIRCUIT_STATE.set(_STATE_VALUES[state], circuit=self.name)
+
+    def retry_after(self) -> float:
+        return max(0.0, self.reset_timeout - (self._clock() - self._opened_at))
+
+    def _reject(self):
+        CIRCUIT_REJECTED.inc(circuit=self.name)
+        raise CircuitOpen(self.name, self.retry_after() or self.reset_timeout)
+
+    def counts_as_failure(self, exc_type, exc) -> bool:
+        if not issubclass(exc_type, Exception) or issubclass(exc_type, self.ignore):
+            return False
+        return self.is_failure is None or self.is_failure(exc)
+
+    def admit(self):
+        state = self.state
+        if state == OPEN:
+            self._reject()
+        if state == HALF_OPEN:
+            if self._probes >= self.half_open_probes:
+                self._reject()
+            self._probes += 1
+
+    async def __aenter__(self):
+        self.admit()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.record_success()
+        elif self.counts_as_failure(exc_type, exc):
+            self.record_failure()
+        else:
+            # 시험 호출이 취소됐거나 실패로 세지 않는 예외면 결과 없이 자리만 돌려준다.
+            self.release_probe()
+        return False
+
+    def release_probe(self):
+        if self._state == HALF_OPEN:
+            self._probes = max(0, self._probes - 1)
+
+    def record_success(self):
+        self._failures = 0
+        if self._state != CLOSED:
+            self._set_state(CLOSED)
+
+    def record_failure(self):
+        self._failures += 1
+        if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+            self._opened_at = self._clock()
+            self._set_state(OPEN)
+
+    def batch(self) -> "CircuitBatch":
+        return CircuitBatch(self)
+
+
+# 요청 하나가 여러 호출로 나뉘어 나갈 때 차단기에는 결과를 한 번만 남긴다.
+# 처음 들어올 때만 차단기 상태를 확인하고, close() 에서 하나라도 성공했으면 성공,
+# 모두 실패했으면 실패 한 번으로 기록한다. 식물이 많은 사용자 한 명이 혼자 차단기를 열지 못하게 하기 위함이다.
+class CircuitBatch:
+    def __init__(self, breaker: CircuitBreaker):
+        self.breaker = breaker
+        self._admitted = False
+        self._succeeded = False
+        self._failed = False
+
+    async def __aenter__(self):
+        if not self._admitted:
+            self.breaker.admit()
+            self._admitted = True
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self._succeeded = True
+        elif self.breaker.counts_as_failure(exc_type, exc):
+            self._failed = True
+        return False
+
+    def close(self):
+        if not self._admitted:
+            return
+        self._admitted = False
+        if self._succeeded:
+            self.breaker.record_success()
+        elif self._failed:
+            self.breaker.record_failure()
+        else:
+            self.breaker.release_probe()
@@ -0,0 +1,122 @@
+import asyncio
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Optional, Sequence
+
+import pymysql
+
+from metrics import stage
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+# pymysql 커넥션을 재사용하는 고정 크기 풀. 오래 쉬었던 커넥션은 ping 으로 확인하고,
+# recycle 초가 지난 커넥션은 닫고 새로 연다.
+class ConnectionPool:
+    def __init__(
+        self,
+        config: dict,
+        max_size: int = 10,
+        recycle: float = 3600,
+        timeout: float = 5,
+        ping_interval: float = 30,
+    ):
+        self.config = dict(config, autocommit=True)
+        self.max_size = max_size
+        self.recycle = recycle
+        self.timeout = timeout
+        self.ping_interval = ping_interval
+        self._idle: "queue.LifoQueue[tuple]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(max_size)
+
+    def _connect(self):
+        now = time.monotonic()
+        return pymysql.connect(**self.config), now, now
+
+    def _checkout(self):
+        if not self._slots.acquire(timeout=self.timeout):
+            raise PoolTimeout("DB 커넥션 풀이 가득 찼습니다.")
+        try:
+            while True:
+                try:
+                    conn, created_at, last_used = self._idle.get_nowait()
+                except queue.Empty:
+                    return self._connect()
+                now = time.monotonic()
+                if now - created_at > self.recycle:
+                    self._close(conn)
+                    continue
+                if now - last_used > self.ping_interval:
+                    try:
+                        conn.ping(reconnect=False)
+                    except pymysql.MySQLError:
+                        self._close(conn)
+                        continue
+                return conn, created_at, last_used
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def _checkin(self, entry, broken: bool):
+        conn, created_at, _ = entry
+        try:
+            if broken or not conn.open:
+                self._close(conn)
+            else:
+                self._idle.put((conn, created_at, time.monotonic()))
+        finally:
+            self._slots.release()
+
+    @staticmethod
+    def _close(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    @contextmanager
+    def connection(self):
+        entry = self._checkout()
+        broken = False
+        try:
+            yield entry[0]
+        except (pymysql.OperationalError, pymysql.InterfaceError):
+            broken = True
+            raise
+        finally:
+            self._checkin(entry, broken)
+
+    def fetchall(self, sql: str, args: Optional[Sequence[Any]] = None) -> list:
+        with stage("db"), self.connection() as conn, conn.cursor() as cursor:
+            cursor.execute(sql, args)
+            return list(cursor.fetchall())
+
+    def fetchone(self, sql: str, args: Optional[Sequence[Any]] = None) -> Optional[dict]:
+        with stage("db"), self.connection() as conn, conn.cursor() as cursor:
+            cursor.execute(sql, args)
+            return cursor.fetchone()
+
+    def execute(self, sql: str, args: Optional[Sequence[Any]] = None) -> int:
+        with stage("db"), self.connection() as conn, conn.cursor() as cursor:
+            return cursor.execute(sql, args)
+
+    async def afetchall(self, sql: str, args: Optional[Sequence[Any]] = None) -> list:
+        return await asyncio.to_thread(self.fetchall, sql, args)
+
+    async def afetchone(self, sql: str, args: Optional[Sequence[Any]] = None) -> Optional[dict]:
+        return await asyncio.to_thread(self.fetchone, sql, args)
+
+    async def aexecute(self, sql: str, args: Optional[Sequence[Any]] = None) -> int:
+        return await asyncio.to_thread(self.execute, sql, args)
+
+    def close(self):
+        while True:
+            try:
+                conn, _, _ = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._close(conn)
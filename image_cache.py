@@ -0,0 +1,136 @@
+import hashlib
+import mmap
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterator, Optional
+
+
+@dataclass
+class CachedImage:
+    sha1: str
+    path: str
+    size: int
+    content_type: str
+
+
+# URL -> SHA-1 블롭으로 저장하는 디스크 이미지 캐시. 전체 용량은 바이트 기준 LRU로 제한한다.
+# 조회 때마다 last_access 를 쓰면 워커끼리 SQLite 쓰기 락을 다투므로, 사용 시각은 메모리에 모았다가
+# access_flush_interval 마다 또는 저장(축출) 직전에 한 번에 기록한다.
+class ImageCache:
+    def __init__(self, directory: str, max_bytes: int, access_flush_interval: float = 30.0):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.access_flush_interval = access_flush_interval
+        self._lock = threading.Lock()
+        self._pending_access: Dict[str, float] = {}
+        self._flushed_at = time.monotonic()
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(
+            os.path.join(directory, "index.sqlite3"), check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS blobs ("
+            "sha1 TEXT PRIMARY KEY, size INTEGER NOT NULL, content_type TEXT NOT NULL, "
+            "last_access REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS urls (url TEXT PRIMARY KEY, sha1 TEXT NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS blobs_last_access ON blobs (last_access)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS urls_sha1 ON urls (sha1)")
+
+    def blob_path(self, sha1: str) -> str:
+        return os.path.join(self.directory, sha1[:2], sha1)
+
+    def lookup(self, url: str) -> Optional[CachedImage]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT b.sha1, b.size, b.content_type FROM urls u JOIN blobs b ON u.sha1 = b.sha1 "
+                "WHERE u.url = ?",
+                (url,),
+            ).fetchone()
+            if row is None:
+                return None
+            path = self.blob_path(row[0])
+            if not os.path.exists(path):
+                self._forget_blob(row[0])
+                return None
+            self._pending_access[row[0]] = time.time()
+            if time.monotonic() - self._flushed_at >= self.access_flush_interval:
+                try:
+                    self._flush_access()
+                except sqlite3.OperationalError:
+                    # 다른 워커가 쓰는 중이면 다음 기회에 기록한다. 조회 자체는 실패시키지 않는다.
+                    pass
+        return CachedImage(sha1=row[0], path=path, size=row[1], content_type=row[2])
+
+    def temp_file(self):
+        return tempfile.mkstemp(dir=self.directory, suffix=".part")
+
+    def store(self, url: str, content: bytes, content_type: str) -> CachedImage:
+        fd, tmp_path = self.temp_file()
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+        return self.store_file(url, tmp_path, hashlib.sha1(content).hexdigest(), content_type)
+
+    def store_file(self, url: str, tmp_path: str, sha1: str, content_type: str) -> CachedImage:
+        path = self.blob_path(sha1)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        size = os.path.getsize(tmp_path)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO blobs (sha1, size, content_type, last_access) VALUES (?, ?, ?, ?)",
+                (sha1, size, content_type, time.time()),
+            )
+            self._conn.execute("INSERT OR REPLACE INTO urls (url, sha1) VALUES (?, ?)", (url, sha1))
+            self._pending_access.pop(sha1, None)
+            self._flush_access()
+            self._evict()
+        return CachedImage(sha1=sha1, path=path, size=size, content_type=content_type)
+
+    def _flush_access(self):
+        if self._pending_access:
+            self._conn.executemany(
+                "UPDATE blobs SET last_access = ? WHERE sha1 = ?",
+                [(accessed_at, sha1) for sha1, accessed_at in self._pending_access.items()],
+            )
+            self._pending_access.clear()
+        self._flushed_at = time.monotonic()
+
+    def _evict(self):
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._conn.execute("SELECT sha1, size FROM blobs ORDER BY last_access").fetchall()
+        for sha1, size in rows:
+            if total <= self.max_bytes:
+                break
+            self._forget_blob(sha1)
+            try:
+                os.remove(self.blob_path(sha1))
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def _forget_blob(self, sha1: str):
+        self._pending_access.pop(sha1, None)
+        self._conn.execute("DELETE FROM urls WHERE sha1 = ?", (sha1,))
+        self._conn.execute("DELETE FROM blobs WHERE sha1 = ?", (sha1,))
+
+
+def iter_file_range(path: str, start: int, end: int, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+    # end 는 포함 범위. 블롭을 mmap 으로 열어 페이지 캐시에서 바로 잘라 보낸다.
+    if end < start:
+        return
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        pos = start
+        while pos <= end:
+            stop = min(pos + chunk_size, end + 1)
+            yield mm[pos:stop]
+            pos = stop
@@ -0,0 +1,52 @@
+import io
+from typing import Optional
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+
+VARIANT_FORMATS = {"webp": ("WEBP", "image/webp"), "jpeg": ("JPEG", "image/jpeg"), "jpg": ("JPEG", "image/jpeg")}
+MAX_VARIANT_SIDE = 2048
+# 디코딩할 원본 픽셀 수 상한. 10 MB 짜리 PNG/WebP 도 풀면 수억 바이트가 될 수 있다.
+# JPEG 은 draft 로 줄여서 읽으므로 줄인 크기 기준으로 센다.
+MAX_SOURCE_PIXELS = 24_000_000
+
+
+def variants_supported() -> bool:
+    return Image is not None
+
+
+def render_variant(
+    path: str,
+    width: Optional[int],
+    height: Optional[int],
+    fmt: str,
+    quality: int = 80,
+    max_pixels: int = MAX_SOURCE_PIXELS,
+) -> bytes:
+    # 원본 비율을 유지하며 width x height 안에 맞추고, 원본보다 크게 늘리지는 않는다.
+    pil_format, _ = VARIANT_FORMATS[fmt]
+    with Image.open(path) as image:
+        image.draft("RGB", (width or MAX_VARIANT_SIDE, height or MAX_VARIANT_SIDE))
+        # Image.open 은 헤더만 읽으므로 여기까지는 픽셀을 풀지 않는다.
+        if image.width * image.height > max_pixels:
+            raise ValueError(f"이미지 픽셀 수 제한 초과: {image.width}x{image.height}")
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail((width or MAX_VARIANT_SIDE, height or MAX_VARIANT_SIDE), Image.LANCZOS)
+        if pil_format == "JPEG" or image.mode not in ("RGB", "RGBA"):
+            if image.mode in ("RGBA", "LA", "P") and pil_format == "JPEG":
+                background = Image.new("RGB", image.size, (255, 255, 255))
+                rgba = image.convert("RGBA")
+                background.paste(rgba, mask=rgba.split()[-1])
+                image = background
+            else:
+                image = image.convert("RGBA" if pil_format == "WEBP" and "A" in image.getbands() else "RGB")
+        out = io.BytesIO()
+        save_kwargs = {"quality": quality}
+        if pil_format == "JPEG":
+            save_kwargs.update(optimize=True, progressive=True)
+        else:
+            save_kwargs["method"] = 4
+        image.save(out, format=pil_format, **save_kwargs)
+        return out.getvalue()
@@ -0,0 +1,68 @@
+import json
+from typing import List
+
+
+# 스트리밍으로 들어오는 JSON 텍스트에서 최상위 객체의 key 배열 원소(객체)를
+# 완성되는 즉시 하나씩 꺼낸다. 예: {"care_advice": [{...}, {...}]}
+class ArrayObjectStream:
+    def __init__(self, key: str):
+        self.key = key
+        self._buffer = ""
+        self._pos = 0
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = -1
+        self._last_key = None
+        self._expect_key = False
+        self._array_depth = -1
+        self._object_start = -1
+
+    def feed(self, text: str) -> List[dict]:
+        self._buffer += text
+        completed = []
+        buf = self._buffer
+        while self._pos < len(buf):
+            ch = buf[self._pos]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if len(self._stack) == 1 and self._expect_key:
+                        self._last_key = json.loads(buf[self._string_start:self._pos + 1])
+                        self._expect_key = False
+            elif ch == '"':
+                self._in_string = True
+                self._string_start = self._pos
+            elif ch in "{[":
+                if (
+                    ch == "{"
+                    and self._array_depth != -1
+                    and len(self._stack) == self._array_depth
+                ):
+                    self._object_start = self._pos
+                self._stack.append(ch)
+                if len(self._stack) == 1:
+                    self._expect_key = ch == "{"
+                elif ch == "[" and len(self._stack) == 2 and self._last_key == self.key:
+                    self._array_depth = 2
+            elif ch in "}]":
+                if self._stack:
+                    self._stack.pop()
+                if ch == "}" and self._object_start != -1 and len(self._stack) == self._array_depth:
+                    try:
+                        item = json.loads(buf[self._object_start:self._pos + 1])
+                    except json.JSONDecodeError:
+                        item = None
+                    if isinstance(item, dict):
+                        completed.append(item)
+                    self._object_start = -1
+                elif ch == "]" and len(self._stack) == self._array_depth - 1:
+                    self._array_depth = -1
+            elif ch == "," and len(self._stack) == 1:
+                self._expect_key = True
+            self._pos += 1
+        return completed
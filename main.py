@@ -1,27 +1,58 @@
 import os
 import json
-from typing import List, Optional
+import re
+import time
+import asyncio
+import unicodedata
+from contextlib import asynccontextmanager, nullcontext
+from typing import AsyncContextManager, Dict, List, Optional
 from dotenv import load_dotenv
-from fastapi import FastAPI, HTTPException, status, Query, Depends, Request
+from fastapi import FastAPI, HTTPException, status, Query, Depends, Request, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from jose import JWTError, jwt
 from pydantic import BaseModel, ValidationError, Field
 from openai import AsyncOpenAI, APIError, APIConnectionError, RateLimitError
-from googleapiclient.discovery import build
+import httpx
 import pymysql
-import requests
 from urllib.parse import unquote, quote, urlparse
 from io import BytesIO
 import hashlib
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
 import mimetypes
 import base64
+from caches import LRUCache, SqliteStore
+from circuit_breaker import CircuitBatch, CircuitBreaker, CircuitOpen
+from db import ConnectionPool, PoolTimeout
+from image_cache import CachedImage, ImageCache, iter_file_range
+from image_variants import MAX_SOURCE_PIXELS, MAX_VARIANT_SIDE, VARIANT_FORMATS, render_variant, variants_supported
+from plant_catalog import PlantCatalog
+from shared_cache import make_cache
+from singleflight import SingleFlight
+from recommendation_table import RecommendationTable
+from json_stream import ArrayObjectStream
+from openai_scheduler import OpenAIScheduler, Overloaded, estimate_tokens
+from metrics import ServerTimingMiddleware, cache_result, record_openai_usage, render_latest, stage
 
 load_dotenv()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    try:
+        yield
+    finally:
+        await close_http_clients()
+        await close_openai_client()
+        db_pool.close()
+        _image_workers.shutdown(wait=False)
+
+
 app = FastAPI(
     title="식물 추천 서비스",
-    description="사용자의 환경 정보를 받아 OpenAI로 식물을 추천하는 기능"
+    description="사용자의 환경 정보를 받아 OpenAI로 식물을 추천하는 기능",
+    lifespan=lifespan,
 )
 
 origins = [
@@ -34,6 +65,8 @@ origins = [
     "https://plantmate.site",
 ]
 
+app.add_middleware(ServerTimingMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
@@ -44,24 +77,186 @@ app.add_middleware(
 
 SECRET_KEY = os.getenv("JWT_SECRET_KEY")
 
+# 키가 없어도 워커는 뜨고, 해당 키가 필요한 기능만 503 으로 응답한다. 상태는 /readyz 에서 확인한다.
 KAKAO_REST_API_KEY = os.getenv("KAKAO_REST_API_KEY")
-if not KAKAO_REST_API_KEY:
-    raise RuntimeError("KAKAO_REST_API_KEY가 .env에 설정되어 있지 않습니다.")
-
 OPENWEATHER_API_KEY = os.getenv("OPENWEATHER_API_KEY")
-if not OPENWEATHER_API_KEY:
-    raise RuntimeError("OPENWEATHER_API_KEY 환경 변수가 설정되지 않았습니다.")
-
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-if not OPENAI_API_KEY:
-    raise RuntimeError("OPENAI_API_KEY 환경 변수가 설정되지 않았습니다. .env 파일을 확인해 주세요.")
-openai_client = AsyncOpenAI(api_key=OPENAI_API_KEY)
-
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 GOOGLE_CSE_ID = os.getenv("GOOGLE_CSE_ID")
-if not GOOGLE_API_KEY or not GOOGLE_CSE_ID:
-    raise RuntimeError("GOOGLE_API_KEY 또는 GOOGLE_CSE_ID 환경 변수가 설정되지 않았습니다. .env 파일을 확인해 주세요.")
-google_search_service = build("customsearch", "v1", developerKey=GOOGLE_API_KEY)
+
+_DEPENDENCY_SETTINGS = {
+    "openai": {"OPENAI_API_KEY": OPENAI_API_KEY},
+    "kakao": {"KAKAO_REST_API_KEY": KAKAO_REST_API_KEY},
+    "openweather": {"OPENWEATHER_API_KEY": OPENWEATHER_API_KEY},
+    "google_cse": {"GOOGLE_API_KEY": GOOGLE_API_KEY, "GOOGLE_CSE_ID": GOOGLE_CSE_ID},
+    "mysql": {"MYSQL_HOST": os.getenv("MYSQL_HOST"), "MYSQL_USER": os.getenv("MYSQL_USER"),
+              "MYSQL_DB": os.getenv("MYSQL_DB")},
+}
+
+
+def missing_settings(dependency: str) -> List[str]:
+    return [name for name, value in _DEPENDENCY_SETTINGS[dependency].items() if not value]
+
+
+def require_dependency(dependency: str):
+    missing = missing_settings(dependency)
+    if missing:
+        raise HTTPException(
+            status_code=503,
+            detail=f"{', '.join(missing)} 환경 변수가 설정되지 않았습니다. .env 파일을 확인해 주세요.",
+        )
+
+
+openai_client: Optional[AsyncOpenAI] = None
+
+
+def get_openai_client() -> AsyncOpenAI:
+    global openai_client
+    if openai_client is None:
+        require_dependency("openai")
+        # 재시도는 openai_scheduler 가 Retry-After 와 동시 호출 한도를 보며 직접 한다.
+        openai_client = AsyncOpenAI(api_key=OPENAI_API_KEY, max_retries=0)
+    return openai_client
+
+
+async def close_openai_client():
+    global openai_client
+    client, openai_client = openai_client, None
+    if client is not None and hasattr(client, "close"):
+        await client.close()
+
+
+openai_scheduler = OpenAIScheduler(
+    concurrency=int(os.getenv("OPENAI_CONCURRENCY", "8")),
+    min_concurrency=int(os.getenv("OPENAI_MIN_CONCURRENCY", "1")),
+    max_concurrency=int(os.getenv("OPENAI_MAX_CONCURRENCY", "32")),
+    tokens_per_minute=int(os.getenv("OPENAI_TOKENS_PER_MINUTE", "30000")),
+    max_queue=int(os.getenv("OPENAI_QUEUE_SIZE", "100")),
+    queue_timeout=float(os.getenv("OPENAI_QUEUE_TIMEOUT", "20")),
+    max_retries=int(os.getenv("OPENAI_MAX_RETRIES", "3")),
+)
+
+
+def _overloaded_error(e: Overloaded) -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail=str(e),
+        headers={"Retry-After": str(max(1, round(e.retry_after)))},
+    )
+
+
+# breaker 는 실제 OpenAI 호출 결과만 보도록 키 확인 뒤에 들어간다. 대기열에서 덜어낸 Overloaded 는
+# breaker 의 ignore 로 넘겨서, 이쪽 과부하가 상류 장애로 세어지지 않게 한다.
+async def openai_completion(max_output_tokens: int, breaker: Optional[AsyncContextManager] = None, **kwargs):
+    tokens = estimate_tokens(kwargs["messages"], max_output_tokens)
+    client = get_openai_client()
+    try:
+        async with breaker or nullcontext():
+            response = await openai_scheduler.call(lambda: client.chat.completions.create(**kwargs), tokens)
+    except Overloaded as e:
+        raise _overloaded_error(e)
+    record_openai_usage(response.usage)
+    return response
+
+
+async def openai_stream(max_output_tokens: int, breaker: Optional[AsyncContextManager] = None, **kwargs):
+    # 스트림을 다 읽을 때까지 슬롯을 쥐고 있어야 동시 호출 수가 실제와 맞는다.
+    tokens = estimate_tokens(kwargs["messages"], max_output_tokens)
+    client = get_openai_client()
+    try:
+        async with breaker or nullcontext():
+            async with openai_scheduler.admit(tokens, kind="stream") as permit:
+                stream = await permit.run(
+                    lambda: client.chat.completions.create(
+                        stream=True, stream_options={"include_usage": True}, **kwargs
+                    )
+                )
+                # 응답 헤더까지는 permit.run 안의 openai 단계로, 본문을 받는 시간은 openai_stream 단계로 잡힌다.
+                with stage("openai_stream"):
+                    async for chunk in stream:
+                        usage = getattr(chunk, "usage", None)
+                        record_openai_usage(usage)
+                        permit.record_usage(usage)
+                        yield chunk
+    except Overloaded as e:
+        raise _overloaded_error(e)
+
+
+def circuit_breaker(name: str, **kwargs) -> CircuitBreaker:
+    return CircuitBreaker(
+        name,
+        failure_threshold=int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5")),
+        reset_timeout=float(os.getenv("CIRCUIT_RESET_TIMEOUT", "30")),
+        **kwargs,
+    )
+
+
+def upstream_failure(exc: BaseException) -> bool:
+    # 연결 실패, 타임아웃, 5xx 만 상류 장애로 센다. 4xx 는 잘못된 요청이라 차단기를 열 이유가 아니다.
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code >= 500
+    return isinstance(exc, httpx.TransportError)
+
+
+def _circuit_open_error(e: CircuitOpen) -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail=str(e),
+        headers={"Retry-After": str(max(1, round(e.retry_after)))},
+    )
+
+
+KAKAO_GEOCODE_URL = os.getenv("KAKAO_GEOCODE_URL", "https://dapi.kakao.com/v2/local/search/address.json")
+OPENWEATHER_URL = os.getenv("OPENWEATHER_URL", "https://api.openweathermap.org/data/2.5/weather")
+GOOGLE_CSE_URL = os.getenv("GOOGLE_CSE_URL", "https://www.googleapis.com/customsearch/v1")
+
+# 업스트림별 keep-alive 커넥션 풀 설정. <NAME>_HTTP_* 가 없으면 HTTP_* 공통값을 사용한다.
+_UPSTREAM_DEFAULTS = {
+    "kakao": {"TIMEOUT": "5", "MAX_CONNECTIONS": "20"},
+    "weather": {"TIMEOUT": "5", "MAX_CONNECTIONS": "20"},
+    "google": {"TIMEOUT": "5", "MAX_CONNECTIONS": "20"},
+    "image": {"TIMEOUT": "15", "MAX_CONNECTIONS": "100"},
+}
+
+
+def _upstream_setting(name: str, key: str) -> str:
+    return os.getenv(
+        f"{name.upper()}_HTTP_{key}",
+        os.getenv(f"HTTP_{key}", _UPSTREAM_DEFAULTS[name].get(key, "")),
+    )
+
+
+_http_clients: Dict[str, httpx.AsyncClient] = {}
+
+
+def get_http_client(name: str) -> httpx.AsyncClient:
+    client = _http_clients.get(name)
+    if client is None or client.is_closed:
+        timeout = float(_upstream_setting(name, "TIMEOUT"))
+        connect_timeout = float(_upstream_setting(name, "CONNECT_TIMEOUT") or min(timeout, 3.0))
+        max_connections = int(_upstream_setting(name, "MAX_CONNECTIONS"))
+        keepalive = int(_upstream_setting(name, "MAX_KEEPALIVE") or max_connections)
+        client = httpx.AsyncClient(
+            timeout=httpx.Timeout(timeout, connect=connect_timeout),
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=keepalive,
+                keepalive_expiry=float(_upstream_setting(name, "KEEPALIVE_EXPIRY") or 30),
+            ),
+            follow_redirects=True,
+        )
+        _http_clients[name] = client
+    return client
+
+
+async def close_http_clients():
+    clients = list(_http_clients.values())
+    _http_clients.clear()
+    for client in clients:
+        await client.aclose()
+
+
+CACHE_DIR = os.getenv("CACHE_DIR", ".cache")
 
 DB_CONFIG = {
     "host": os.getenv("MYSQL_HOST"),
@@ -71,6 +266,14 @@ DB_CONFIG = {
     "cursorclass": pymysql.cursors.DictCursor,
 }
 
+db_pool = ConnectionPool(
+    DB_CONFIG,
+    max_size=int(os.getenv("MYSQL_POOL_SIZE", "10")),
+    recycle=float(os.getenv("MYSQL_POOL_RECYCLE", "3600")),
+    timeout=float(os.getenv("MYSQL_POOL_TIMEOUT", "5")),
+    ping_interval=float(os.getenv("MYSQL_POOL_PING_INTERVAL", "30")),
+)
+
 class EnvironmentInput(BaseModel):
     has_south_sun: bool = False
     has_north_sun: bool = False
@@ -111,6 +314,19 @@ def get_user_id_optional(
     except (JWTError, ValueError) as e:
         raise HTTPException(status_code=401, detail=f"유효하지 않은 토큰입니다: {e}")
 
+PLANT_LOCATIONS = {
+    "Indoor": "창가에서 1m 이상 떨어진 실내",
+    "Window": "창가 바로 옆 (직사광선 가능성이 있음)",
+    "Balcony": "베란다/발코니 (야외와 유사한 환경)"
+}
+
+WATER_FREQUENCIES = {
+    1: "흙이 마르면 바로 물을 주는 것을 선호합니다 (물을 자주 주는 편)",
+    2: "흙 표면이 마르면 물을 주는 것을 선호합니다 (주 1~2회 정도)",
+    3: "흙 속까지 완전히 마르면 물을 주는 것을 선호합니다 (주 1회 미만 또는 더 긴 간격)",
+    4: "한 달 이상 간격으로 물을 주는 것을 선호합니다 (물을 매우 드물게 주는 편)"
+}
+
 def get_env_description(
     has_south_sun: bool,
     has_north_sun: bool,
@@ -137,49 +353,223 @@ def get_env_description(
     else:
         sun_direction_str = f"여러 방향의 햇빛이 들어옵니다: {', '.join(sun_directions)}"
 
-    location_map = {
-        "Indoor": "창가에서 1m 이상 떨어진 실내",
-        "Window": "창가 바로 옆 (직사광선 가능성이 있음)",
-        "Balcony": "베란다/발코니 (야외와 유사한 환경)"
-    }
-
-    water_map = {
-        1: "흙이 마르면 바로 물을 주는 것을 선호합니다 (물을 자주 주는 편)",
-        2: "흙 표면이 마르면 물을 주는 것을 선호합니다 (주 1~2회 정도)",
-        3: "흙 속까지 완전히 마르면 물을 주는 것을 선호합니다 (주 1회 미만 또는 더 긴 간격)",
-        4: "한 달 이상 간격으로 물을 주는 것을 선호합니다 (물을 매우 드물게 주는 편)"
-    }
-
     blinds_status = "블라인드/커튼이 있습니다." if has_blinds_curtains else "블라인드/커튼이 없습니다."
 
     return (
         f"화분을 놓을 곳의 햇빛 환경: {sun_direction_str}\n"
-        f"식물 위치: {location_map.get(plant_location, '알 수 없음')}\n"
+        f"식물 위치: {PLANT_LOCATIONS.get(plant_location, '알 수 없음')}\n"
         f"블라인드/커튼 유무: {blinds_status}\n"
-        f"물주기 빈도: {water_map.get(water_frequency, '알 수 없음')}"
+        f"물주기 빈도: {WATER_FREQUENCIES.get(water_frequency, '알 수 없음')}"
     )
 
 
+PLANT_CATALOG_TTL = float(os.getenv("PLANT_CATALOG_TTL", "3600"))
+PLANT_CATALOG_RETRY = float(os.getenv("PLANT_CATALOG_RETRY", "60"))
+PLANT_CATALOG_THRESHOLD = float(os.getenv("PLANT_CATALOG_THRESHOLD", "0.7"))
+
+# plants 테이블로 만든 이름 색인. DB 가 없어도 워커는 떠야 하므로 처음 쓸 때 읽고, TTL 이 지나면 백그라운드에서 다시 읽는다.
+plant_catalog = PlantCatalog()
+_plant_catalog_next_load = 0.0
+_plant_catalog_lock = asyncio.Lock()
+_plant_catalog_refreshing = False
+
+
+async def load_plant_catalog() -> PlantCatalog:
+    plants = await db_pool.afetchall("SELECT plant_id, plant_name FROM plants")
+    try:
+        aliases = await db_pool.afetchall("SELECT plant_id, alias FROM plant_aliases")
+    except pymysql.MySQLError as e:
+        print(f"[Catalog] 별칭 조회 실패: {e}")
+        aliases = []
+    return PlantCatalog(
+        ((r["plant_id"], r["plant_name"]) for r in plants),
+        ((r["plant_id"], r["alias"]) for r in aliases),
+        threshold=PLANT_CATALOG_THRESHOLD,
+    )
+
+
+async def _reload_plant_catalog():
+    global plant_catalog, _plant_catalog_next_load
+    try:
+        catalog = await load_plant_catalog()
+    except Exception as e:
+        print(f"[Catalog] 식물 카탈로그 로드 실패: {e}")
+        _plant_catalog_next_load = time.monotonic() + PLANT_CATALOG_RETRY
+        return
+    # 이전 카탈로그의 대표 이미지는 그대로 이어받는다.
+    for plant_id, entry in catalog.entries.items():
+        previous = plant_catalog.entries.get(plant_id)
+        if previous is not None and previous.name == entry.name:
+            entry.image_url = previous.image_url
+    plant_catalog = catalog
+    _plant_catalog_next_load = time.monotonic() + PLANT_CATALOG_TTL
+
+
+async def _reload_plant_catalog_in_background():
+    global _plant_catalog_refreshing
+    try:
+        async with _plant_catalog_lock:
+            if time.monotonic() >= _plant_catalog_next_load:
+                await _reload_plant_catalog()
+    finally:
+        _plant_catalog_refreshing = False
+
+
+async def get_plant_catalog(wait: bool = True) -> PlantCatalog:
+    # wait=False 면 아직 비어 있어도 기다리지 않고 백그라운드 로드만 건다. DB 가 필요 없는 경로(추천)가
+    # MySQL 연결 timeout 에 묶이지 않게 하기 위함이다.
+    global _plant_catalog_refreshing
+    if time.monotonic() < _plant_catalog_next_load:
+        return plant_catalog
+    if len(plant_catalog) == 0 and wait:
+        async with _plant_catalog_lock:
+            if time.monotonic() >= _plant_catalog_next_load:
+                await _reload_plant_catalog()
+    elif not _plant_catalog_refreshing:
+        _plant_catalog_refreshing = True
+        _spawn(_reload_plant_catalog_in_background())
+    return plant_catalog
+
+
+def plant_key(plant_name: str) -> str:
+    # 캐시 키와 이름 비교에 쓴다. 카탈로그에 있는 식물은 plant_id 로, 없는 식물은 정규화한 이름으로 묶인다.
+    return plant_catalog.key(plant_name)
+
+
+PLANT_IMAGE_CACHE_TTL = float(os.getenv("PLANT_IMAGE_CACHE_TTL", str(7 * 24 * 3600)))
+PLANT_IMAGE_NEGATIVE_TTL = float(os.getenv("PLANT_IMAGE_NEGATIVE_TTL", "3600"))
+
+_MISSING = object()
+# 검색 결과가 없는 식물은 None 으로 짧게 캐시한다(네거티브 캐시).
+_plant_image_cache = make_cache("plant_image", maxsize=int(os.getenv("PLANT_IMAGE_CACHE_SIZE", "2048")))
+_plant_image_flight = SingleFlight("cse")
+
+
+PLANT_CATALOG_IMAGE_TTL = float(os.getenv("PLANT_CATALOG_IMAGE_TTL", str(30 * 24 * 3600)))
+# 카탈로그 식물마다 대표 이미지 한 장을 오래 보관한다.
+_plant_image_store = SqliteStore(
+    os.getenv("PLANT_IMAGE_STORE_PATH", os.path.join(CACHE_DIR, "plant_images.sqlite3")),
+    "plant_images",
+)
+
+
+async def _search_plant_image_upstream(plant_name: str) -> Optional[str]:
+    require_dependency("google_cse")
+    params = {
+        "key": GOOGLE_API_KEY,
+        "cx": GOOGLE_CSE_ID,
+        "q": f"{plant_name} 식물",
+        "searchType": "image",
+        "num": 1,
+    }
+    response = await get_http_client("google").get(GOOGLE_CSE_URL, params=params)
+    response.raise_for_status()
+    res = response.json()
+    if 'items' in res and len(res['items']) > 0:
+        return res['items'][0].get('link')
+    return None
+
+
 async def search_plant_image(plant_name: str) -> Optional[str]:
+    entry = plant_catalog.entry(plant_name)
+    key = plant_key(plant_name)
+    cached = await _plant_image_cache.aget(key, _MISSING)
+    if cached is _MISSING and entry is not None:
+        cached = entry.image_url or await _plant_image_store.aget(str(entry.plant_id), max_age=PLANT_CATALOG_IMAGE_TTL)
+        if cached is None:
+            cached = _MISSING
+        else:
+            entry.image_url = cached
+            await _plant_image_cache.aset(key, cached, ttl=PLANT_IMAGE_CACHE_TTL)
+    if cached is not _MISSING:
+        cache_result("plant_image", "hit")
+        return cached
+    cache_result("plant_image", "miss")
+    return await _plant_image_flight.do(key, lambda: _refresh_plant_image(plant_name, key, entry))
+
+
+async def _refresh_plant_image(plant_name: str, key: str, entry) -> Optional[str]:
     try:
-        res = google_search_service.cse().list(
-            q=f"{plant_name} 식물",
-            cx=GOOGLE_CSE_ID,
-            searchType="image",
-            num=1
-        ).execute()
-        if 'items' in res and len(res['items']) > 0:
-            return res['items'][0].get('link')
-        return None
+        with stage("cse"):
+            link = await _search_plant_image_upstream(entry.name if entry is not None else plant_name)
     except Exception:
         return None
+    await _plant_image_cache.aset(key, link, ttl=PLANT_IMAGE_CACHE_TTL if link else PLANT_IMAGE_NEGATIVE_TTL)
+    if entry is not None and link:
+        entry.image_url = link
+        # 저장에 실패해도(aset 은 로그만 남긴다) 이미 찾은 링크는 그대로 돌려준다.
+        await _plant_image_store.aset(str(entry.plant_id), link)
+    return link
+
+
+async def _attach_image_url(item: dict) -> dict:
+    plant_name = item.get("name")
+    if plant_name:
+        await get_plant_catalog(wait=False)
+        image_url = await search_plant_image(plant_name)
+        if image_url:
+            item["image_url"] = f"/precommend/proxy-image?url={quote(image_url, safe='')}"
+        else:
+            item["image_url"] = None
+    return item
+
+
+# 주소를 찾지 못한 것(ValueError)이나 4xx 는 카카오 장애가 아니므로 차단기 실패로 세지 않는다.
+_geocode_breaker = circuit_breaker("kakao", ignore=(ValueError,), is_failure=upstream_failure)
+_geocode_flight = SingleFlight("geocode")
+_geocode_memory = make_cache("geocode", maxsize=int(os.getenv("GEOCODE_CACHE_SIZE", "4096")))
+_geocode_store = SqliteStore(
+    os.getenv("GEOCODE_CACHE_PATH", os.path.join(CACHE_DIR, "geocode.sqlite3")),
+    "geocode",
+)
+
+
+def normalize_address(address: str) -> str:
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFC", address)).strip().lower()
+
+
+async def get_lat_lon_from_address(address: str):
+    key = normalize_address(address)
+    cached = await _geocode_memory.aget(key)
+    if cached is None:
+        cached = await _geocode_store.aget(key)
+        if cached is not None:
+            await _geocode_memory.aset(key, cached)
+    if cached is not None:
+        cache_result("geocode", "hit")
+        return cached[0], cached[1]
+    cache_result("geocode", "miss")
+    return await refresh_geocode(address)
+
+
+async def refresh_geocode(address: str):
+    # 같은 주소를 동시에 조회하면 카카오 호출은 한 번만 나간다.
+    return await _geocode_flight.do(normalize_address(address), lambda: _refresh_geocode_upstream(address))
 
 
-def get_lat_lon_from_address(address: str):
+async def _refresh_geocode_upstream(address: str):
+    require_dependency("kakao")
+    async with _geocode_breaker:
+        with stage("geocode"):
+            lat, lon = await fetch_lat_lon_from_kakao(address)
+    key = normalize_address(address)
+    await _geocode_memory.aset(key, (lat, lon))
+    await _geocode_store.aset(key, [lat, lon])
+    return lat, lon
+
+
+async def _warm_geocode(address: str):
+    try:
+        await refresh_geocode(address)
+    except Exception as e:
+        print(f"[Geocode] 주소 좌표 갱신 실패: {e}")
+
+
+async def fetch_lat_lon_from_kakao(address: str):
+    require_dependency("kakao")
     headers = {"Authorization": f"KakaoAK {KAKAO_REST_API_KEY}"}
     params = {"query": address}
-    url = "https://dapi.kakao.com/v2/local/search/address.json"
-    response = requests.get(url, headers=headers, params=params)
+    response = await get_http_client("kakao").get(KAKAO_GEOCODE_URL, headers=headers, params=params)
     response.raise_for_status()
     result = response.json()
     if result["documents"]:
@@ -188,15 +578,104 @@ def get_lat_lon_from_address(address: str):
     raise ValueError("주소로부터 위도/경도를 찾을 수 없습니다.")
 
 
-def get_weather_info(lat: float, lon: float):
-    url = (
-        f"https://api.openweathermap.org/data/2.5/weather?"
-        f"lat={lat}&lon={lon}&appid={OPENWEATHER_API_KEY}&units=metric&lang=kr"
-    )
-    response = requests.get(url)
+WEATHER_GRID_DEG = float(os.getenv("WEATHER_GRID_DEG", "0.05"))
+WEATHER_CACHE_TTL = float(os.getenv("WEATHER_CACHE_TTL", "600"))
+WEATHER_CACHE_MAX_STALE = float(os.getenv("WEATHER_CACHE_MAX_STALE", "3600"))
+
+# (격자 셀) -> (OpenWeather 응답, 조회 시각). 만료 여부는 fetch_weather 에서 직접 판단한다.
+_weather_cache = make_cache("weather", maxsize=int(os.getenv("WEATHER_CACHE_SIZE", "4096")))
+_weather_refreshing: set = set()
+_background_tasks: set = set()
+_weather_breaker = circuit_breaker("openweather", is_failure=upstream_failure)
+_weather_flight = SingleFlight("weather")
+# 격자 셀마다 마지막으로 성공한 응답. 장애 중이면 오래된 값이라도 stale 표시를 달아 돌려준다.
+_weather_last_good = SqliteStore(
+    os.getenv("WEATHER_LAST_GOOD_PATH", os.path.join(CACHE_DIR, "weather.sqlite3")),
+    "weather_last_good",
+)
+
+
+def _spawn(coro):
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+
+def weather_cell(lat: float, lon: float):
+    return round(lat / WEATHER_GRID_DEG), round(lon / WEATHER_GRID_DEG)
+
+
+async def _fetch_weather_upstream(lat: float, lon: float) -> dict:
+    require_dependency("openweather")
+    params = {"lat": lat, "lon": lon, "appid": OPENWEATHER_API_KEY, "units": "metric", "lang": "kr"}
+    response = await get_http_client("weather").get(OPENWEATHER_URL, params=params)
     response.raise_for_status()
-    data = response.json()
-    return {
+    return response.json()
+
+
+async def _refresh_weather(cell) -> dict:
+    # 같은 격자 셀의 갱신(요청 경로와 백그라운드 갱신 모두)은 하나로 합친다.
+    return await _weather_flight.do(cell, lambda: _refresh_weather_upstream(cell))
+
+
+async def _refresh_weather_upstream(cell) -> dict:
+    lat = round(cell[0] * WEATHER_GRID_DEG, 6)
+    lon = round(cell[1] * WEATHER_GRID_DEG, 6)
+    require_dependency("openweather")
+    async with _weather_breaker:
+        with stage("weather"):
+            data = await _fetch_weather_upstream(lat, lon)
+    await _weather_cache.aset(cell, (data, time.time()))
+    await _weather_last_good.aset(_cell_key(cell), data)
+    return data
+
+
+def _cell_key(cell) -> str:
+    return f"{cell[0]},{cell[1]}"
+
+
+async def _refresh_weather_in_background(cell):
+    try:
+        await _refresh_weather(cell)
+    except Exception as e:
+        print(f"[Weather] 백그라운드 갱신 실패 {cell}: {e}")
+    finally:
+        _weather_refreshing.discard(cell)
+
+
+async def fetch_weather_or_stale(lat: float, lon: float):
+    # (응답, stale 여부). stale 은 허용 기간을 넘긴 마지막 성공 응답을 장애 때문에 대신 줄 때만 True.
+    cell = weather_cell(lat, lon)
+    cached = await _weather_cache.aget(cell)
+    if cached is not None:
+        data, fetched_at = cached
+        # 워커끼리 캐시를 공유할 수 있으므로 조회 시각은 벽시계 기준이다.
+        age = time.time() - fetched_at
+        if age < WEATHER_CACHE_TTL:
+            cache_result("weather", "hit")
+            return data, False
+        if age < WEATHER_CACHE_TTL + WEATHER_CACHE_MAX_STALE:
+            cache_result("weather", "stale")
+            if cell not in _weather_refreshing:
+                _weather_refreshing.add(cell)
+                _spawn(_refresh_weather_in_background(cell))
+            return data, False
+    cache_result("weather", "miss")
+    try:
+        return await _refresh_weather(cell), False
+    except Exception as e:
+        last_good = cached[0] if cached is not None else await _weather_last_good.aget(_cell_key(cell))
+        if last_good is None:
+            raise
+        print(f"[Weather] 마지막 성공 응답으로 대체 {cell}: {e}")
+        cache_result("weather", "last_good")
+        return last_good, True
+
+
+async def get_weather_info(lat: float, lon: float):
+    data, stale = await fetch_weather_or_stale(lat, lon)
+    info = {
         "temperature": data["main"]["temp"],
         "feels_like": data["main"]["feels_like"],
         "humidity": data["main"]["humidity"],
@@ -204,66 +683,87 @@ def get_weather_info(lat: float, lon: float):
         "wind": data["wind"]["speed"],
         "rain": data.get("rain", {}).get("1h", 0),
     }
+    if stale:
+        info["stale"] = True
+    return info
+
+# 성장 리포트에 적은 식물은 트리거가 user_report_plants 에 모아 둔다(migrations/003).
+# 리포트가 몇 개든 (user_id, plant_name) 기본 키 범위만 읽고, 리포트 식물이 없을 때만 user_plants 로 넘어간다.
+_USER_PLANTS_SQL = """
+    SELECT rp.plant_name, 0 AS source
+    FROM user_report_plants rp
+    WHERE rp.user_id = %s
+    UNION ALL
+    SELECT p.plant_name, 1 AS source
+    FROM user_plants up
+    JOIN plants p ON up.plant_id = p.plant_id
+    WHERE up.user_id = %s
+      AND NOT EXISTS (SELECT 1 FROM user_report_plants rp2 WHERE rp2.user_id = %s)
+"""
+
+
+async def _list_my_plant_names(user_id: int) -> List[str]:
+    rows = await db_pool.afetchall(
+        f"SELECT x.plant_name FROM ({_USER_PLANTS_SQL}) x ORDER BY x.source, x.plant_name",
+        (user_id, user_id, user_id),
+    )
+    return [r["plant_name"] for r in rows]
+
+
+async def list_my_plants(user_id: int) -> List[str]:
+    # 화면에는 사용자가 적은 이름을 그대로 보여 준다. 카탈로그는 조언 캐시 키와 이름 비교(plant_key)에만 쓴다.
+    return await _list_my_plant_names(user_id)
+
+
+async def get_user_plants(user_id: int) -> List[str]:
+    return await list_my_plants(user_id)
+
+
+async def get_user_plants_with_address(user_id: int):
+    # 주소와 식물 목록(성장 리포트 우선, 없으면 user_plants)을 한 번의 쿼리로 가져온다.
+    rows = await db_pool.afetchall(f"""
+        SELECT u.address, x.plant_name, x.source
+        FROM users u
+        LEFT JOIN ({_USER_PLANTS_SQL}) x ON TRUE
+        WHERE u.user_id = %s
+        ORDER BY x.source, x.plant_name
+    """, (user_id, user_id, user_id, user_id))
+    if not rows or not rows[0]["address"]:
+        raise ValueError("해당 유저의 주소를 찾을 수 없습니다.")
+    address = rows[0]["address"]
+    named = [r for r in rows if r["plant_name"] is not None]
+    if not named:
+        return address, []
+    first_source = named[0]["source"]
+    return address, [r["plant_name"] for r in named if r["source"] == first_source]
+
+CARE_ADVICE_CACHE_TTL = float(os.getenv("CARE_ADVICE_CACHE_TTL", str(6 * 3600)))
+CARE_ADVICE_TEMP_BAND = float(os.getenv("CARE_ADVICE_TEMP_BAND", "5"))
+# 식물 하나당 조언(300자 이내) 응답에 드는 토큰 추정치. 호출 전 토큰 예산을 잡는 데만 쓴다.
+CARE_ADVICE_TOKENS_PER_PLANT = int(os.getenv("CARE_ADVICE_TOKENS_PER_PLANT", "300"))
+# 식물이 많은 사용자는 청크로 나눠 동시에 요청한다. 응답에서 빠진 식물은 최대 ROUNDS 번까지 다시 요청한다.
+CARE_ADVICE_CHUNK_SIZE = int(os.getenv("CARE_ADVICE_CHUNK_SIZE", "4"))
+CARE_ADVICE_MAX_ROUNDS = int(os.getenv("CARE_ADVICE_MAX_ROUNDS", "2"))
+
+# (정규화된 식물 이름, 날씨 구간) -> 관리 조언
+_care_advice_cache = make_cache(
+    "care_advice",
+    maxsize=int(os.getenv("CARE_ADVICE_CACHE_SIZE", "8192")),
+    ttl=CARE_ADVICE_CACHE_TTL,
+    # 식물 하나의 조언이 한국어 수백 자라 mmap 기본 슬롯(2 KB)에는 들어가지 않는다.
+    slot_size=int(os.getenv("CARE_ADVICE_CACHE_SLOT_BYTES", "4096")),
+)
+_care_advice_breaker = circuit_breaker("openai", ignore=(Overloaded,))
 
-def get_user_plants_from_reports(user_id: int) -> List[str]:
-    conn = pymysql.connect(**DB_CONFIG)
-    try:
-        with conn.cursor() as cursor:
-            cursor.execute("""
-                SELECT DISTINCT plant_name
-                FROM user_plant_growth_reports
-                WHERE user_id = %s
-                  AND plant_name IS NOT NULL
-                  AND plant_name <> ''
-                ORDER BY plant_name
-            """, (user_id,))
-            rows = cursor.fetchall()
-            return [r["plant_name"] for r in rows]
-    finally:
-        conn.close()
-
-
-def list_my_plants(user_id: int) -> List[str]:
-    names = get_user_plants_from_reports(user_id)
-    if names:
-        return names
-    conn = pymysql.connect(**DB_CONFIG)
-    try:
-        with conn.cursor() as c:
-            c.execute("""
-                SELECT p.plant_name
-                FROM user_plants up
-                JOIN plants p ON up.plant_id = p.plant_id
-                WHERE up.user_id = %s
-                ORDER BY p.plant_name
-            """, (user_id,))
-            rows = c.fetchall()
-            return [r["plant_name"] for r in rows]
-    finally:
-        conn.close()
-
-
-def get_user_plants(user_id: int) -> List[str]:
-    return list_my_plants(user_id)
 
+def care_weather_bucket(weather_info: dict):
+    band = int(float(weather_info["temperature"]) // CARE_ADVICE_TEMP_BAND)
+    return band, str(weather_info["weather"]).strip()
 
-def get_user_plants_with_address(user_id: int):
-    conn = pymysql.connect(**DB_CONFIG)
-    try:
-        with conn.cursor() as cursor:
-            cursor.execute("SELECT address FROM users WHERE user_id = %s", (user_id,))
-            user = cursor.fetchone()
-            if not user or not user["address"]:
-                raise ValueError("해당 유저의 주소를 찾을 수 없습니다.")
-            address = user["address"]
-            plants = list_my_plants(user_id)
-            return address, plants
-    finally:
-        conn.close()
 
-async def generate_batch_care_advice(plant_names: List[str], weather_info: dict) -> List[dict]:
+def _care_advice_prompt(plant_names: List[str], weather_info: dict) -> str:
     plant_names_str = ", ".join(plant_names)
-    prompt = f"""
+    return f"""
     당신은 식물 관리 전문가입니다.
     오늘 날씨는 다음과 같습니다:
     - 현재 기온: {weather_info['temperature']}°C
@@ -273,8 +773,16 @@ async def generate_batch_care_advice(plant_names: List[str], weather_info: dict)
     응답은 반드시 아래와 같은 JSON 객체 형식으로만 반환해야 합니다.
     예시: {{"care_advice": [{{"plant": "식물 이름 1", "advice": "관리 조언 1"}}, {{"plant": "식물 이름 2", "advice": "관리 조언 2"}}]}}
     """
+
+
+async def _generate_care_advice_upstream(
+    plant_names: List[str], weather_info: dict, circuit: Optional[AsyncContextManager] = None
+) -> List[dict]:
+    prompt = _care_advice_prompt(plant_names, weather_info)
     try:
-        response = await openai_client.chat.completions.create(
+        response = await openai_completion(
+            CARE_ADVICE_TOKENS_PER_PLANT * len(plant_names),
+            breaker=circuit or _care_advice_breaker,
             model="gpt-4o",
             messages=[{"role": "user", "content": prompt}],
             response_format={"type": "json_object"},
@@ -287,11 +795,254 @@ async def generate_batch_care_advice(plant_names: List[str], weather_info: dict)
         return advice_json_object["care_advice"]
     except json.JSONDecodeError:
         raise HTTPException(status_code=500, detail="OpenAI 응답 형식 오류가 발생했습니다.")
+    except (HTTPException, CircuitOpen):
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"식물 관리 조언 생성 중 오류가 발생했습니다: {e}")
 
-@app.post("/precommend/recommend", response_model=PlantRecommendationResponse)
-async def recommend_plants(env_input: EnvironmentInput):
+
+async def _stream_care_advice_upstream(
+    plant_names: List[str], weather_info: dict, circuit: Optional[AsyncContextManager] = None
+):
+    prompt = _care_advice_prompt(plant_names, weather_info)
+    parser = ArrayObjectStream("care_advice")
+    async for chunk in openai_stream(
+        CARE_ADVICE_TOKENS_PER_PLANT * len(plant_names),
+        breaker=circuit or _care_advice_breaker,
+        model="gpt-4o",
+        messages=[{"role": "user", "content": prompt}],
+        response_format={"type": "json_object"},
+        temperature=0.7,
+    ):
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta.content
+        if delta:
+            for entry in parser.feed(delta):
+                yield entry
+
+
+async def _split_cached_advice(plant_names: List[str], bucket):
+    advice_by_name: Dict[str, str] = {}
+    misses: List[str] = []
+    keys = [plant_key(name) for name in plant_names]
+    cached_values = await _care_advice_cache.aget_many([(key, bucket) for key in keys])
+    for name, key, cached in zip(plant_names, keys, cached_values):
+        if cached is not None:
+            advice_by_name[key] = cached
+        elif key not in advice_by_name and name not in misses:
+            misses.append(name)
+    cache_result("care_advice", "hit", len(advice_by_name))
+    cache_result("care_advice", "miss", len(misses))
+    return advice_by_name, misses
+
+
+def _chunked(items: list, size: int) -> List[list]:
+    size = max(1, size)
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def _unique_plants(plant_names: List[str]) -> Dict[str, str]:
+    unique: Dict[str, str] = {}
+    for name in plant_names:
+        unique.setdefault(plant_key(name), name)
+    return unique
+
+
+def _match_advice(plant_names: List[str], entries: List[dict]) -> Dict[str, str]:
+    # 요청한 이름과 맞는 항목만 받는다. 모델이 이름을 바꿔 적은 항목은
+    # 빠진 식물 수와 정확히 같을 때만 요청 순서대로 채우고, 나머지는 다시 요청하게 둔다.
+    wanted = _unique_plants(plant_names)
+    matched: Dict[str, str] = {}
+    unmatched = []
+    for entry in entries:
+        advice = entry.get("advice") if isinstance(entry, dict) else None
+        if not isinstance(advice, str) or not advice.strip():
+            continue
+        key = plant_key(str(entry.get("plant", "")))
+        if key in wanted and key not in matched:
+            matched[key] = advice
+        else:
+            unmatched.append(advice)
+    missing = [key for key in wanted if key not in matched]
+    if unmatched and len(unmatched) == len(missing):
+        matched.update(zip(missing, unmatched))
+    return matched
+
+
+async def _generate_care_chunk(plant_names: List[str], weather_info: dict, circuit: CircuitBatch) -> Dict[str, str]:
+    entries = await _generate_care_advice_upstream(plant_names, weather_info, circuit)
+    return _match_advice(plant_names, entries)
+
+
+def _should_retry_care(error: Optional[Exception]) -> bool:
+    # 차단기가 열렸거나 과부하로 503 을 받은 청크를 곧바로 다시 보내면 부하만 두 배가 된다.
+    if isinstance(error, CircuitOpen):
+        return False
+    return not (isinstance(error, HTTPException) and error.status_code == 503)
+
+
+async def _generate_missing_advice(
+    plant_names: List[str], weather_info: dict, rounds: int, circuit: Optional[CircuitBatch] = None
+) -> Dict[str, str]:
+    # 청크들을 동시에 요청하고, 응답에서 빠졌거나 실패한 청크의 식물만 모아 다음 라운드에 다시 요청한다.
+    # 차단기에는 청크마다가 아니라 이 요청 전체의 결과를 한 번만 남긴다.
+    batch = circuit or _care_advice_breaker.batch()
+    found: Dict[str, str] = {}
+    pending = list(_unique_plants(plant_names).values())
+    error: Optional[Exception] = None
+    try:
+        for _ in range(max(1, rounds)):
+            results = await asyncio.gather(
+                *(_generate_care_chunk(chunk, weather_info, batch)
+                  for chunk in _chunked(pending, CARE_ADVICE_CHUNK_SIZE)),
+                return_exceptions=True,
+            )
+            for result in results:
+                if isinstance(result, Exception):
+                    if _should_retry_care(error):
+                        error = result
+                elif isinstance(result, BaseException):
+                    raise result
+                else:
+                    found.update(result)
+            pending = [name for name in pending if plant_key(name) not in found]
+            if not pending or not _should_retry_care(error):
+                break
+    finally:
+        if circuit is None:
+            batch.close()
+    if not found and error is not None:
+        raise error
+    return found
+
+
+async def generate_batch_care_advice(plant_names: List[str], weather_info: dict) -> List[dict]:
+    bucket = care_weather_bucket(weather_info)
+    advice_by_name, misses = await _split_cached_advice(plant_names, bucket)
+
+    if misses:
+        generated = await _generate_missing_advice(misses, weather_info, CARE_ADVICE_MAX_ROUNDS)
+        for key, advice in generated.items():
+            await _care_advice_cache.aset((key, bucket), advice)
+        advice_by_name.update(generated)
+
+    result = []
+    for name in plant_names:
+        advice = advice_by_name.get(plant_key(name))
+        if advice is not None:
+            result.append({"plant": name, "advice": advice})
+    return result
+
+
+async def stream_batch_care_advice(plant_names: List[str], weather_info: dict):
+    # 캐시에 있는 조언을 먼저 내보내고, 나머지는 청크별 스트림을 동시에 열어 식물 하나가 완성될 때마다 내보낸다.
+    # 같은 식물을 가리키는 이름(별칭)이 여러 개면 조언은 한 번 만들고 요청한 이름마다 내보낸다.
+    bucket = care_weather_bucket(weather_info)
+    advice_by_name, misses = await _split_cached_advice(plant_names, bucket)
+    names_by_key: Dict[str, List[str]] = {}
+    for name in dict.fromkeys(plant_names):
+        key = plant_key(name)
+        names_by_key.setdefault(key, []).append(name)
+        if key in advice_by_name:
+            yield {"plant": name, "advice": advice_by_name[key]}
+
+    if not misses:
+        return
+    pending = _unique_plants(misses)
+    queue: asyncio.Queue = asyncio.Queue()
+    batch = _care_advice_breaker.batch()
+
+    async def run_chunk(chunk: List[str]):
+        try:
+            async for entry in _stream_care_advice_upstream(chunk, weather_info, batch):
+                await queue.put(entry)
+        except Exception as e:
+            await queue.put(e)
+        finally:
+            await queue.put(None)
+
+    try:
+        tasks = [asyncio.create_task(run_chunk(chunk)) for chunk in _chunked(list(pending.values()), CARE_ADVICE_CHUNK_SIZE)]
+        error: Optional[Exception] = None
+        try:
+            remaining = len(tasks)
+            while remaining:
+                entry = await queue.get()
+                if entry is None:
+                    remaining -= 1
+                    continue
+                if isinstance(entry, Exception):
+                    if _should_retry_care(error):
+                        error = entry
+                    continue
+                advice = entry.get("advice")
+                key = plant_key(str(entry.get("plant", "")))
+                if isinstance(advice, str) and advice.strip() and key in pending:
+                    pending.pop(key)
+                    await _care_advice_cache.aset((key, bucket), advice)
+                    for name in names_by_key[key]:
+                        yield {"plant": name, "advice": advice}
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        # 스트림에서 빠진 식물(이름이 바뀌었거나 잘린 경우, 실패한 청크)만 다시 요청한다.
+        if pending and CARE_ADVICE_MAX_ROUNDS > 1 and _should_retry_care(error):
+            try:
+                generated = await _generate_missing_advice(
+                    list(pending.values()), weather_info, CARE_ADVICE_MAX_ROUNDS - 1, batch
+                )
+            except Exception as e:
+                generated, error = {}, e
+            for key, advice in generated.items():
+                if key in pending:
+                    pending.pop(key)
+                    await _care_advice_cache.aset((key, bucket), advice)
+                    for name in names_by_key[key]:
+                        yield {"plant": name, "advice": advice}
+        if pending and error is not None:
+            raise error
+    finally:
+        batch.close()
+
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+_SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+_RECOMMEND_TOOLS = [{
+    "type": "function",
+    "function": {
+        "name": "recommend_plants",
+        "description": "사용자의 환경 조건에 맞는 식물을 추천합니다.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "recommendations": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "name": {"type": "string"},
+                            "description": {"type": "string"},
+                        },
+                        "required": ["name", "description"]
+                    },
+                    "minItems": 3,
+                    "maxItems": 3
+                }
+            },
+            "required": ["recommendations"]
+        }
+    }
+}]
+
+
+def _recommend_messages(env_input: EnvironmentInput) -> List[dict]:
     env_description = get_env_description(
         env_input.has_south_sun,
         env_input.has_north_sun,
@@ -302,33 +1053,6 @@ async def recommend_plants(env_input: EnvironmentInput):
         env_input.water_frequency
     )
 
-    tools = [{
-        "type": "function",
-        "function": {
-            "name": "recommend_plants",
-            "description": "사용자의 환경 조건에 맞는 식물을 추천합니다.",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "recommendations": {
-                        "type": "array",
-                        "items": {
-                            "type": "object",
-                            "properties": {
-                                "name": {"type": "string"},
-                                "description": {"type": "string"},
-                            },
-                            "required": ["name", "description"]
-                        },
-                        "minItems": 3,
-                        "maxItems": 3
-                    }
-                },
-                "required": ["recommendations"]
-            }
-        }
-    }]
-
     prompt_content = f"""
     당신은 식물 추천 전문가입니다.
     사용자로부터 다음과 같은 거주 환경 정보를 받았습니다:
@@ -338,43 +1062,205 @@ async def recommend_plants(env_input: EnvironmentInput):
     설명은 200자 이내로 자세하게 작성해주세요.
     """
 
-    try:
-        response = await openai_client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": "You are a helpful plant recommendation expert. Provide plant recommendations in the specified JSON format using the recommend_plants tool."},
-                {"role": "user", "content": prompt_content}
-            ],
-            tool_choice={"type": "function", "function": {"name": "recommend_plants"}},
-            tools=tools,
-            temperature=0.7,
-            max_tokens=500
+    return [
+        {"role": "system", "content": "You are a helpful plant recommendation expert. Provide plant recommendations in the specified JSON format using the recommend_plants tool."},
+        {"role": "user", "content": prompt_content}
+    ]
+
+
+async def generate_recommendations(env_input: EnvironmentInput) -> List[RecommendedPlant]:
+    response = await openai_completion(
+        500,
+        model="gpt-4o",
+        messages=_recommend_messages(env_input),
+        tool_choice={"type": "function", "function": {"name": "recommend_plants"}},
+        tools=_RECOMMEND_TOOLS,
+        temperature=0.7,
+        max_tokens=500
+    )
+
+    tool_calls = response.choices[0].message.tool_calls
+    if not tool_calls or tool_calls[0].function.name != "recommend_plants":
+        raise ValueError("OpenAI가 recommend_plants 함수 호출을 반환하지 않았습니다.")
+
+    recommended_data_str = tool_calls[0].function.arguments
+    parsed_response_dict = json.loads(recommended_data_str)
+    final_recommendations_list = parsed_response_dict.get("recommendations", [])
+    if not final_recommendations_list:
+        raise ValueError("추천 결과가 비었습니다.")
+
+    updated = await asyncio.gather(*(_attach_image_url(item) for item in final_recommendations_list))
+    return [RecommendedPlant(**it) for it in updated]
+
+
+RECOMMEND_TABLE_VARIANTS = int(os.getenv("RECOMMEND_TABLE_VARIANTS", "3"))
+RECOMMEND_TABLE_MAX_AGE = float(os.getenv("RECOMMEND_TABLE_MAX_AGE", str(14 * 24 * 3600)))
+
+_recommendation_table = RecommendationTable(
+    os.getenv("RECOMMEND_TABLE_PATH", os.path.join(CACHE_DIR, "recommendations.sqlite3"))
+)
+_recommendation_rotation: Dict[str, int] = {}
+_recommendation_refreshing: set = set()
+
+
+def recommendation_key(env_input: EnvironmentInput) -> Optional[str]:
+    if env_input.plant_location not in PLANT_LOCATIONS or env_input.water_frequency not in WATER_FREQUENCIES:
+        return None
+    flags = "".join(
+        "1" if flag else "0"
+        for flag in (
+            env_input.has_south_sun,
+            env_input.has_north_sun,
+            env_input.has_east_sun,
+            env_input.has_west_sun,
+            env_input.has_blinds_curtains,
         )
+    )
+    return f"{flags}|{env_input.plant_location}|{env_input.water_frequency}"
+
+
+def _plants_to_rows(plants: List[RecommendedPlant]) -> List[dict]:
+    return [{"name": p.name, "description": p.description, "image_url": p.image_url} for p in plants]
+
+
+async def _add_recommendation_variant(key: str, rows: List[dict], max_variants: int):
+    # 테이블 파일은 워커끼리 함께 쓰므로 쓰기 락을 기다릴 수 있다. 저장은 스레드에서 하고, 실패해도 응답은 그대로 준다.
+    try:
+        await asyncio.to_thread(_recommendation_table.add, key, rows, max_variants)
+    except sqlite3.Error as e:
+        print(f"[Recommend] 추천 테이블 저장 실패 {key}: {e}")
+
+
+async def store_generated_recommendations(key: str, env_input: EnvironmentInput, max_variants: Optional[int] = None):
+    plants = await generate_recommendations(env_input)
+    await _add_recommendation_variant(key, _plants_to_rows(plants), max_variants or RECOMMEND_TABLE_VARIANTS)
+    return plants
+
+
+async def _refresh_recommendations_in_background(key: str, env_input: EnvironmentInput):
+    try:
+        await store_generated_recommendations(key, env_input)
+    except Exception as e:
+        print(f"[Recommend] 추천 테이블 갱신 실패 {key}: {e}")
+    finally:
+        _recommendation_refreshing.discard(key)
+
+
+async def _serve_precomputed(key: str, env_input: EnvironmentInput) -> Optional[List[RecommendedPlant]]:
+    try:
+        variants = await asyncio.to_thread(_recommendation_table.variants, key)
+    except sqlite3.Error as e:
+        print(f"[Recommend] 추천 테이블 조회 실패 {key}: {e}")
+        variants = []
+    if not variants:
+        cache_result("recommendation_table", "miss")
+        return None
+    cache_result("recommendation_table", "hit")
+    index = _recommendation_rotation.get(key, 0)
+    _recommendation_rotation[key] = index + 1
+    rows, created_at = variants[index % len(variants)]
+    # 오래된 변형만 남아 있거나 변형 수가 부족하면 응답은 그대로 주고 백그라운드에서 새로 생성한다.
+    newest = max(c for _, c in variants)
+    needs_refresh = time.time() - newest > RECOMMEND_TABLE_MAX_AGE or len(variants) < RECOMMEND_TABLE_VARIANTS
+    if needs_refresh and key not in _recommendation_refreshing:
+        _recommendation_refreshing.add(key)
+        _spawn(_refresh_recommendations_in_background(key, env_input))
+    return [RecommendedPlant(**row) for row in rows]
+
+
+async def _stream_recommendation_events(env_input: EnvironmentInput, key: Optional[str]):
+    # 이벤트 순서: plant(완성되는 대로) / image(이미지 검색이 끝나는 대로) -> done.
+    queue: asyncio.Queue = asyncio.Queue()
+    plants: List[dict] = []
+
+    async def resolve_image(index: int, item: dict):
+        await _attach_image_url(item)
+        await queue.put(("image", {"index": index, "image_url": item.get("image_url")}))
+
+    async def produce():
+        image_tasks = []
+        try:
+            parser = ArrayObjectStream("recommendations")
+            async for chunk in openai_stream(
+                500,
+                model="gpt-4o",
+                messages=_recommend_messages(env_input),
+                tool_choice={"type": "function", "function": {"name": "recommend_plants"}},
+                tools=_RECOMMEND_TOOLS,
+                temperature=0.7,
+                max_tokens=500,
+            ):
+                if not chunk.choices or not chunk.choices[0].delta.tool_calls:
+                    continue
+                arguments = chunk.choices[0].delta.tool_calls[0].function.arguments
+                if not arguments:
+                    continue
+                for item in parser.feed(arguments):
+                    if not item.get("name"):
+                        continue
+                    plant = RecommendedPlant(**item)
+                    item = {"name": plant.name, "description": plant.description, "image_url": None}
+                    index = len(plants)
+                    plants.append(item)
+                    await queue.put(("plant", {"index": index, "name": plant.name, "description": plant.description}))
+                    image_tasks.append(asyncio.create_task(resolve_image(index, item)))
+            await asyncio.gather(*image_tasks)
+            if not plants:
+                raise ValueError("추천 결과가 비었습니다.")
+            if key is not None:
+                await _add_recommendation_variant(key, plants, RECOMMEND_TABLE_VARIANTS)
+        except Exception as e:
+            for task in image_tasks:
+                task.cancel()
+            await queue.put(("error", {"detail": f"식물 추천 중 오류가 발생했습니다: {e}"}))
+        finally:
+            await queue.put(None)
+
+    producer = asyncio.create_task(produce())
+    try:
+        while True:
+            event = await queue.get()
+            if event is None:
+                break
+            yield _sse(*event)
+        if plants:
+            yield _sse("done", {"recommendations": plants})
+    finally:
+        producer.cancel()
+
+
+async def _replay_recommendations(plants: List[RecommendedPlant]):
+    rows = _plants_to_rows(plants)
+    for index, row in enumerate(rows):
+        yield _sse("plant", {"index": index, "name": row["name"], "description": row["description"]})
+        yield _sse("image", {"index": index, "image_url": row["image_url"]})
+    yield _sse("done", {"recommendations": rows})
 
-        tool_calls = response.choices[0].message.tool_calls
-        if not tool_calls or tool_calls[0].function.name != "recommend_plants":
-            raise ValueError("OpenAI가 recommend_plants 함수 호출을 반환하지 않았습니다.")
-
-        recommended_data_str = tool_calls[0].function.arguments
-        parsed_response_dict = json.loads(recommended_data_str)
-        final_recommendations_list = parsed_response_dict.get("recommendations", [])
-        if not final_recommendations_list:
-            raise ValueError("추천 결과가 비었습니다.")
-
-        updated = []
-        for item in final_recommendations_list:
-            plant_name = item.get("name")
-            if plant_name:
-                image_url = await search_plant_image(plant_name)
-                if image_url:
-                    item["image_url"] = f"/precommend/proxy-image?url={quote(image_url, safe='')}"
-                else:
-                    item["image_url"] = None
-            updated.append(item)
 
-        validated = [RecommendedPlant(**it) for it in updated]
+@app.post("/precommend/recommend", response_model=PlantRecommendationResponse)
+async def recommend_plants(env_input: EnvironmentInput, stream: bool = Query(False)):
+    if stream:
+        key = recommendation_key(env_input)
+        precomputed = await _serve_precomputed(key, env_input) if key is not None else None
+        if precomputed:
+            events = _replay_recommendations(precomputed)
+        else:
+            events = _stream_recommendation_events(env_input, key)
+        return StreamingResponse(events, media_type="text/event-stream", headers=_SSE_HEADERS)
+
+    try:
+        key = recommendation_key(env_input)
+        if key is not None:
+            precomputed = await _serve_precomputed(key, env_input)
+            if precomputed:
+                return PlantRecommendationResponse(recommendations=precomputed)
+            validated = await store_generated_recommendations(key, env_input)
+        else:
+            validated = await generate_recommendations(env_input)
         return PlantRecommendationResponse(recommendations=validated)
 
+    except HTTPException:
+        raise
     except (json.JSONDecodeError, ValueError, ValidationError) as e:
         raise HTTPException(status_code=500, detail=f"OpenAI 응답 형식 오류: {e}")
     except APIError as e:
@@ -408,63 +1294,353 @@ def _guess_mime_from_path(path: str) -> str:
         return "image/webp"
     return "image/jpeg"
 
+# 같은 URL 을 동시에 받는 요청은 다운로드 하나를 함께 기다린다(스트리밍 응답도 포함).
+_image_flight = SingleFlight("image")
+_image_cache = ImageCache(
+    os.getenv("IMAGE_CACHE_DIR", os.path.join(CACHE_DIR, "images")),
+    int(os.getenv("IMAGE_CACHE_MAX_BYTES", str(512 * 1024 * 1024))),
+)
+
+
+PROXY_IMAGE_STREAMING = os.getenv("PROXY_IMAGE_STREAMING", "1").lower() not in ("0", "false", "no")
+PROXY_IMAGE_MAX_BYTES = int(os.getenv("PROXY_IMAGE_MAX_BYTES", str(10 * 1024 * 1024)))
+PROXY_FIRST_BYTE_TIMEOUT = float(os.getenv("PROXY_FIRST_BYTE_TIMEOUT", "5"))
+PROXY_TOTAL_TIMEOUT = float(os.getenv("PROXY_TOTAL_TIMEOUT", "30"))
+PROXY_CHUNK_SIZE = 64 * 1024
+
+
+class ImageTooLarge(ValueError):
+    pass
+
+
+# 크기 제한을 넘은 URL 은 잠시 기억해 두고, 같은 URL 을 기다리던 요청들이 다시 받지 않게 한다.
+_oversized_images = LRUCache(maxsize=1024, ttl=float(os.getenv("PROXY_OVERSIZED_TTL", "3600")))
+
+
+def _image_headers(etag: str) -> Dict[str, str]:
+    return {
+        "Access-Control-Allow-Origin": "*",
+        "Cache-Control": "public, max-age=86400, immutable",
+        "ETag": etag,
+        "Accept-Ranges": "bytes",
+    }
+
+
 def _ok_response(content_bytes: bytes, content_type: str) -> StreamingResponse:
     etag = hashlib.sha1(content_bytes).hexdigest()
     stream = BytesIO(content_bytes)
     r = StreamingResponse(stream, media_type=content_type)
-    r.headers["Access-Control-Allow-Origin"] = "*"
-    r.headers["Cache-Control"] = "public, max-age=86400, immutable"
-    r.headers["ETag"] = etag
+    r.headers.update(_image_headers(etag))
     r.headers["Content-Length"] = str(len(content_bytes))
-    r.headers["Accept-Ranges"] = "bytes"
     return r
 
-@app.get("/proxy-image")
-async def proxy_image(url: str):
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == "*" or candidate.strip('"') == etag:
+            return True
+    return False
+
+
+def _parse_range(range_header: str, size: int):
+    # 단일 바이트 범위만 지원한다. 해석할 수 없으면 None(전체 전송), 범위 밖이면 ValueError.
+    unit, _, spec = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    start_s, sep, end_s = spec.strip().partition("-")
+    if not sep:
+        return None
     try:
-        decoded_url = unquote(url)
-        parsed = urlparse(decoded_url)
+        if start_s == "":
+            length = int(end_s)
+            if length <= 0:
+                raise ValueError("빈 범위")
+            start, end = max(size - length, 0), size - 1
+        else:
+            start = int(start_s)
+            end = int(end_s) if end_s else size - 1
+    except ValueError:
+        raise ValueError("잘못된 Range 헤더")
+    end = min(end, size - 1)
+    if start > end or start >= size:
+        raise ValueError("범위를 만족할 수 없음")
+    return start, end
+
+
+def _cached_image_response(request: Request, image: CachedImage) -> Response:
+    headers = _image_headers(image.sha1)
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match and _etag_matches(if_none_match, image.sha1):
+        return Response(status_code=304, headers=headers)
+
+    range_header = request.headers.get("Range")
+    if_range = request.headers.get("If-Range")
+    if range_header and (not if_range or if_range.strip('"') == image.sha1):
+        try:
+            byte_range = _parse_range(range_header, image.size)
+        except ValueError:
+            headers["Content-Range"] = f"bytes */{image.size}"
+            return Response(status_code=416, headers=headers)
+        if byte_range is not None:
+            start, end = byte_range
+            headers["Content-Range"] = f"bytes {start}-{end}/{image.size}"
+            headers["Content-Length"] = str(end - start + 1)
+            return StreamingResponse(
+                iter_file_range(image.path, start, end),
+                status_code=206,
+                media_type=image.content_type,
+                headers=headers,
+            )
+
+    headers["Content-Length"] = str(image.size)
+    return StreamingResponse(
+        iter_file_range(image.path, 0, image.size - 1),
+        media_type=image.content_type,
+        headers=headers,
+    )
 
-        req_headers = {
-            "User-Agent": ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
-                           "(KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36"),
-            "Accept": "image/avif,image/webp,image/*,*/*;q=0.8",
-            "Accept-Language": "ko,en;q=0.9",
-        }
-        host = parsed.hostname or ""
-        for k, v in _FORCE_REFERERS.items():
-            if host == k or host.endswith("." + k):
-                req_headers["Referer"] = v
-                break
 
-        resp = requests.get(decoded_url, headers=req_headers, timeout=15, allow_redirects=True)
-        resp.raise_for_status()
+def _upstream_image_type(resp: httpx.Response, path: str) -> str:
+    content_type = (resp.headers.get("Content-Type") or "").split(";")[0].lower().strip()
+    if not content_type.startswith("image/"):
+        content_type = _guess_mime_from_path(path)
+    return content_type
+
+
+async def _open_image_upstream(url: str, req_headers: Dict[str, str]):
+    # 응답 헤더와 첫 청크까지 받는다. 선언된 Content-Length 가 제한을 넘으면 본문을 받기 전에 거절한다.
+    if _oversized_images.get(url):
+        raise ImageTooLarge(f"이미지 크기 제한 초과: {url}")
+    client = get_http_client("image")
+    deadline = asyncio.get_running_loop().time() + PROXY_TOTAL_TIMEOUT
+    resp = None
+    try:
+        with stage("image_fetch"):
+            resp = await asyncio.wait_for(
+                client.send(client.build_request("GET", url, headers=req_headers), stream=True),
+                PROXY_FIRST_BYTE_TIMEOUT,
+            )
+            resp.raise_for_status()
+            declared = resp.headers.get("Content-Length")
+            if declared and declared.isdigit() and int(declared) > PROXY_IMAGE_MAX_BYTES:
+                _oversized_images.set(url, True)
+                raise ImageTooLarge(f"이미지 크기 제한 초과: {declared} bytes")
+            chunks = resp.aiter_bytes(PROXY_CHUNK_SIZE)
+            first_chunk = await asyncio.wait_for(chunks.__anext__(), PROXY_FIRST_BYTE_TIMEOUT)
+    except BaseException:
+        if resp is not None:
+            await resp.aclose()
+        raise
+    return resp, chunks, first_chunk, deadline
+
+
+async def _iter_image_body(url: str, chunks, first_chunk: bytes, deadline: float):
+    # 받은 만큼 세면서 내보내고, 크기 제한이나 전체 시간 제한을 넘으면 그 자리에서 멈춘다.
+    loop = asyncio.get_running_loop()
+    chunk = first_chunk
+    size = 0
+    while True:
+        size += len(chunk)
+        if size > PROXY_IMAGE_MAX_BYTES:
+            _oversized_images.set(url, True)
+            raise ImageTooLarge(f"이미지 크기 제한 초과: {url}")
+        yield chunk
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            raise TimeoutError(f"이미지 전송 시간 초과: {url}")
+        try:
+            chunk = await asyncio.wait_for(chunks.__anext__(), remaining)
+        except StopAsyncIteration:
+            return
+
+
+async def _stream_image_response(
+    url: str, req_headers: Dict[str, str], path: str, flight: Optional[asyncio.Future] = None
+) -> StreamingResponse:
+    # 첫 청크까지 받은 뒤에 응답을 시작한다. 그 전의 실패는 호출부에서 투명 PNG로 대체되고,
+    # 이후의 실패(크기 초과, 전체 시간 초과)는 연결을 끊어 전송을 중단한다.
+    try:
+        resp, chunks, first_chunk, deadline = await _open_image_upstream(url, req_headers)
+    except BaseException as e:
+        if flight is not None and not flight.done():
+            flight.set_exception(e if isinstance(e, Exception) else RuntimeError(f"이미지 전송 취소: {url}"))
+        raise
+
+    content_type = _upstream_image_type(resp, path)
+
+    async def body():
+        digest = hashlib.sha1()
+        fd, tmp_path = _image_cache.temp_file()
+        completed = False
+        try:
+            with os.fdopen(fd, "wb") as f:
+                async for chunk in _iter_image_body(url, chunks, first_chunk, deadline):
+                    digest.update(chunk)
+                    f.write(chunk)
+                    yield chunk
+            completed = True
+        finally:
+            await resp.aclose()
+            image = None
+            if completed:
+                image = await asyncio.to_thread(_image_cache.store_file, url, tmp_path, digest.hexdigest(), content_type)
+            else:
+                os.remove(tmp_path)
+            if flight is not None and not flight.done():
+                if image is not None:
+                    flight.set_result(image)
+                else:
+                    flight.set_exception(RuntimeError(f"이미지 전송 중단: {url}"))
 
-        content_type = (resp.headers.get("Content-Type") or "").split(";")[0].lower().strip()
-        if not content_type.startswith("image/"):
-            content_type = _guess_mime_from_path(parsed.path)
+    headers = {
+        "Access-Control-Allow-Origin": "*",
+        "Cache-Control": "public, max-age=86400, immutable",
+    }
+    declared = resp.headers.get("Content-Length")
+    if declared and "Content-Encoding" not in resp.headers:
+        headers["Content-Length"] = declared
+    return StreamingResponse(body(), media_type=content_type, headers=headers)
+
+IMAGE_VARIANT_QUALITY = int(os.getenv("IMAGE_VARIANT_QUALITY", "80"))
+IMAGE_VARIANT_MAX_PIXELS = int(os.getenv("IMAGE_VARIANT_MAX_PIXELS", str(MAX_SOURCE_PIXELS)))
+# Pillow 는 디코딩/리사이즈/인코딩 중 GIL 을 풀어 주므로 스레드 풀로도 이벤트 루프와 분리된다.
+_image_workers = ThreadPoolExecutor(
+    max_workers=int(os.getenv("IMAGE_RESIZE_WORKERS", str(os.cpu_count() or 2))),
+    thread_name_prefix="image-resize",
+)
 
-        return _ok_response(resp.content, content_type)
+
+def _upstream_request_headers(host: str) -> Dict[str, str]:
+    req_headers = {
+        "User-Agent": ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+                       "(KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36"),
+        "Accept": "image/avif,image/webp,image/*,*/*;q=0.8",
+        "Accept-Language": "ko,en;q=0.9",
+    }
+    for k, v in _FORCE_REFERERS.items():
+        if host == k or host.endswith("." + k):
+            req_headers["Referer"] = v
+            break
+    return req_headers
+
+
+async def _fetch_and_store_image(decoded_url: str) -> CachedImage:
+    return await _image_flight.do(decoded_url, lambda: _download_image(decoded_url))
+
+
+async def _download_image(decoded_url: str) -> CachedImage:
+    # 스트리밍 응답과 같은 제한(Content-Length 사전 확인, 읽는 중 크기 제한, 첫 바이트/전체 시간 제한)으로 받아
+    # 메모리에 모으지 않고 임시 파일에 바로 쓴다.
+    parsed = urlparse(decoded_url)
+    req_headers = _upstream_request_headers(parsed.hostname or "")
+    resp, chunks, first_chunk, deadline = await _open_image_upstream(decoded_url, req_headers)
+    content_type = _upstream_image_type(resp, parsed.path)
+    digest = hashlib.sha1()
+    fd, tmp_path = _image_cache.temp_file()
+    completed = False
+    try:
+        with os.fdopen(fd, "wb") as f:
+            async for chunk in _iter_image_body(decoded_url, chunks, first_chunk, deadline):
+                digest.update(chunk)
+                f.write(chunk)
+        completed = True
+    finally:
+        await resp.aclose()
+        if not completed:
+            os.remove(tmp_path)
+    return await asyncio.to_thread(_image_cache.store_file, decoded_url, tmp_path, digest.hexdigest(), content_type)
+
+
+async def _image_variant(decoded_url: str, w: Optional[int], h: Optional[int], fmt: str) -> CachedImage:
+    variant_key = f"{decoded_url}#w={w or ''}&h={h or ''}&format={fmt}"
+    variant = await asyncio.to_thread(_image_cache.lookup, variant_key)
+    if variant is not None:
+        cache_result("image_variant", "hit")
+        return variant
+    cache_result("image_variant", "miss")
+
+    original = await asyncio.to_thread(_image_cache.lookup, decoded_url)
+    if original is None:
+        original = await _fetch_and_store_image(decoded_url)
+    loop = asyncio.get_running_loop()
+    with stage("image_resize"):
+        data = await loop.run_in_executor(
+            _image_workers, render_variant, original.path, w, h, fmt, IMAGE_VARIANT_QUALITY,
+            IMAGE_VARIANT_MAX_PIXELS,
+        )
+    return await asyncio.to_thread(_image_cache.store, variant_key, data, VARIANT_FORMATS[fmt][1])
+
+
+@app.get("/proxy-image")
+async def proxy_image(
+    url: str,
+    request: Request,
+    w: Optional[int] = Query(None, ge=1, le=MAX_VARIANT_SIDE),
+    h: Optional[int] = Query(None, ge=1, le=MAX_VARIANT_SIDE),
+    format: Optional[str] = Query(None, pattern="^(webp|jpeg|jpg)$"),
+):
+    try:
+        decoded_url = unquote(url)
+        if (w or h or format) and variants_supported():
+            try:
+                variant = await _image_variant(decoded_url, w, h, format or "webp")
+                return _cached_image_response(request, variant)
+            except Exception as e:
+                print(f"[Proxy Error] 이미지 변환 실패 {e} - 원본 사용")
+
+        cached = await asyncio.to_thread(_image_cache.lookup, decoded_url)
+        if cached is not None:
+            cache_result("image", "hit")
+            return _cached_image_response(request, cached)
+        cache_result("image", "miss")
+
+        if PROXY_IMAGE_STREAMING:
+            pending = _image_flight.join(decoded_url)
+            if pending is not None:
+                # 이미 누가 받고 있으면 저장이 끝나길 기다렸다가 캐시에서 준다. 그쪽이 실패하면 직접 받는다.
+                try:
+                    image = await asyncio.wait_for(asyncio.shield(pending), PROXY_TOTAL_TIMEOUT)
+                    return _cached_image_response(request, image)
+                except asyncio.CancelledError:
+                    if not pending.cancelled():
+                        raise
+                except Exception:
+                    pass
+                return _cached_image_response(request, await _fetch_and_store_image(decoded_url))
+            parsed = urlparse(decoded_url)
+            req_headers = _upstream_request_headers(parsed.hostname or "")
+            flight = _image_flight.lead(decoded_url, PROXY_FIRST_BYTE_TIMEOUT + PROXY_TOTAL_TIMEOUT)
+            return await _stream_image_response(decoded_url, req_headers, parsed.path, flight)
+
+        image = await _fetch_and_store_image(decoded_url)
+        return _cached_image_response(request, image)
 
     except Exception as e:
         print(f"[Proxy Error] {e} - Fallback transparent PNG")
         return _ok_response(_TRANSPARENT_PNG, "image/png")
 
 @app.get("/precommend/proxy-image")
-async def proxy_image_alias(url: str):
-    return await proxy_image(url)
+async def proxy_image_alias(
+    url: str,
+    request: Request,
+    w: Optional[int] = Query(None, ge=1, le=MAX_VARIANT_SIDE),
+    h: Optional[int] = Query(None, ge=1, le=MAX_VARIANT_SIDE),
+    format: Optional[str] = Query(None, pattern="^(webp|jpeg|jpg)$"),
+):
+    return await proxy_image(url, request, w, h, format)
 
 @app.get("/weather")
-def get_weather(address: str = Query(...)):
+async def get_weather(address: str = Query(...)):
     try:
-        lat, lon = get_lat_lon_from_address(address)
+        lat, lon = await get_lat_lon_from_address(address)
         url = (
-            f"https://api.openweathermap.org/data/2.5/weather?"
+            f"{OPENWEATHER_URL}?"
             f"lat={lat}&lon={lon}&appid={OPENWEATHER_API_KEY}&units=metric&lang=kr"
         )
-        response = requests.get(url)
-        response.raise_for_status()
-        data = response.json()
+        data, stale = await fetch_weather_or_stale(lat, lon)
         rain_1h = data.get("rain", {}).get("1h", 0.0)
         weather = {
             "위치": data.get("name", "알 수 없음"),
@@ -476,115 +1652,361 @@ def get_weather(address: str = Query(...)):
             "구름량(%)": data["clouds"]["all"],
             "강수량(mm, 1시간)": rain_1h,
         }
-        return {"address": address, "lat": lat, "lon": lon, "url": url, "weather": weather}
+        result = {"address": address, "lat": lat, "lon": lon, "url": url, "weather": weather}
+        if stale:
+            result["stale"] = True
+        return result
     except Exception as e:
         return {"error": str(e)}
 
+@app.exception_handler(pymysql.MySQLError)
+@app.exception_handler(PoolTimeout)
+async def database_unavailable(request: Request, exc: Exception):
+    print(f"[DB Error] {exc}")
+    return JSONResponse(status_code=503, content={"detail": "데이터베이스에 연결할 수 없습니다."})
+
+@app.get("/readyz")
+async def readyz():
+    dependencies = {}
+    for name in _DEPENDENCY_SETTINGS:
+        missing = missing_settings(name)
+        dependencies[name] = {"ready": not missing, "missing": missing}
+    if dependencies["mysql"]["ready"]:
+        try:
+            await asyncio.wait_for(db_pool.afetchone("SELECT 1"), timeout=2)
+        except Exception as e:
+            dependencies["mysql"] = {"ready": False, "error": str(e)}
+    ready = all(d["ready"] for d in dependencies.values())
+    return {"status": "ok" if ready else "degraded", "dependencies": dependencies}
+
+@app.get("/metrics")
+def metrics():
+    return Response(render_latest(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 @app.get("/precommend/my-plants")
-def get_my_plants(user_id: int = Depends(get_user_id_optional)):
-    plants = list_my_plants(user_id)
+async def get_my_plants(user_id: int = Depends(get_user_id_optional)):
+    plants = await list_my_plants(user_id)
     return {"plants": plants}
 
-async def _care_handler(user_id: int, address: Optional[str], plant_name: Optional[str] = None):
+PLANT_CARE_RESULT_MAX_AGE = int(os.getenv("PLANT_CARE_RESULT_MAX_AGE", str(12 * 3600)))
+
+
+def build_care_payload(address: str, weather_info: dict, advices: List[dict]) -> dict:
+    return {
+        "address": address,
+        "weather": {
+            "기온(°C)": weather_info["temperature"],
+            "습도(%)": weather_info["humidity"],
+            "바람속도(m/s)": weather_info["wind"],
+            "날씨": weather_info["weather"],
+            "강수량(mm, 1시간)": weather_info.get("rain", 0),
+        },
+        "care_advice": advices,
+    }
+
+
+def _select_plant(payload: dict, plant_name: Optional[str]) -> Optional[dict]:
+    # 요청한 식물이 저장된 결과에 없으면 None. 다른 식물의 조언으로 대신하지 않는다.
+    if plant_name:
+        wanted = plant_key(plant_name)
+        selected = [a for a in payload.get("care_advice", []) if plant_key(a.get("plant") or "") == wanted]
+        if not selected:
+            return None
+        payload["care_advice"] = selected
+    return payload
+
+
+async def load_stored_care(user_id: int, max_age: Optional[int] = PLANT_CARE_RESULT_MAX_AGE) -> Optional[dict]:
+    # 배치 작업(batch_plant_care.py)이 만들어 둔 결과 중 충분히 최신인 것만 사용한다.
+    # max_age=None 이면 나이와 상관없이 가장 최근 결과를 가져온다(장애 시 대체용).
+    sql = "SELECT payload, address FROM plant_care_results WHERE user_id = %s"
+    params = [user_id]
+    if max_age is not None:
+        sql += " AND generated_at >= NOW() - INTERVAL %s SECOND"
+        params.append(max_age)
+    try:
+        row = await db_pool.afetchone(sql, tuple(params))
+    except pymysql.MySQLError as e:
+        print(f"[PlantCare] 저장된 결과 조회 실패: {e}")
+        return None
+    if row is None:
+        return None
+    return json.loads(row["payload"])
+
+
+async def load_current_care(user_id: int, plant_name: Optional[str] = None) -> Optional[dict]:
+    # 배치 결과는 지금의 식물 목록과 같을 때만 쓴다. 배치 이후 식물을 추가/삭제했거나
+    # 일부 식물의 조언이 빠졌거나 요청한 식물이 결과에 없으면 None 을 돌려 실시간 경로로 넘긴다.
+    try:
+        stored, current_plants = await asyncio.gather(load_stored_care(user_id), _list_my_plant_names(user_id))
+    except pymysql.MySQLError as e:
+        print(f"[PlantCare] 식물 목록 조회 실패: {e}")
+        return None
+    if stored is None or not current_plants:
+        return None
+    if {a.get("plant") for a in stored.get("care_advice", [])} != set(current_plants):
+        return None
+    if plant_name:
+        await get_plant_catalog()
+    return _select_plant(stored, plant_name)
+
+
+# 사용자마다 마지막으로 성공한 관리 조언. 상류 장애 중에는 이 값을 stale 표시와 함께 돌려준다.
+_care_last_good = SqliteStore(
+    os.getenv("CARE_LAST_GOOD_PATH", os.path.join(CACHE_DIR, "plant_care.sqlite3")),
+    "care_last_good",
+)
+
+
+def _store_care(user_id: int, payload: dict):
+    # plant_name 으로 일부 식물만 요청한 경우에도 다른 식물의 이전 조언은 남겨 둔다.
+    previous = _care_last_good.get(str(user_id))
+    if previous and normalize_address(previous.get("address") or "") == normalize_address(payload["address"]):
+        fresh = {a.get("plant") for a in payload["care_advice"]}
+        kept = [a for a in previous.get("care_advice", []) if a.get("plant") not in fresh]
+        payload = {**payload, "care_advice": payload["care_advice"] + kept}
+    _care_last_good.set(str(user_id), payload)
+
+
+async def _remember_care_in_background(user_id: int, payload: dict):
+    try:
+        await asyncio.to_thread(_store_care, user_id, payload)
+    except Exception as e:
+        print(f"[PlantCare] 마지막 결과 저장 실패: {e}")
+
+
+def _remember_care(user_id: int, payload: dict):
+    # 저장소 파일은 워커끼리 함께 쓰므로 쓰기 락을 기다릴 수 있다. 응답은 기다리지 않고 백그라운드에서 저장한다.
+    if payload.get("stale") or not payload.get("care_advice"):
+        return
+    _spawn(_remember_care_in_background(user_id, payload))
+
+
+async def last_good_care(user_id: int, address: str, plant_name: Optional[str] = None) -> Optional[dict]:
+    payload = await _care_last_good.aget(str(user_id))
+    if payload is None:
+        payload = await load_stored_care(user_id, max_age=None)
+    if payload is None or normalize_address(payload.get("address") or "") != normalize_address(address):
+        return None
+    payload = _select_plant(payload, plant_name)
+    if payload is None:
+        return None
+    payload["stale"] = True
+    return payload
+
+
+async def _cached_care_handler(user_id: int, address: Optional[str], plant_name: Optional[str] = None):
+    if not address:
+        stored = await load_current_care(user_id, plant_name)
+        if stored is not None:
+            return stored
+    return await _care_handler(user_id, address, plant_name)
+
+
+async def _resolve_care_target(user_id: int, address: Optional[str], plant_name: Optional[str]):
     try:
         if address:
             address_to_use = address
-            all_plants = get_user_plants(user_id)
+            all_plants = await get_user_plants(user_id)
         else:
-            address_to_use, all_plants = get_user_plants_with_address(user_id)
+            address_to_use, all_plants = await get_user_plants_with_address(user_id)
     except ValueError as e:
         raise HTTPException(status_code=422, detail=str(e))
 
     if not address_to_use:
         raise HTTPException(status_code=422, detail="주소가 필요합니다. (users.address가 비어있음)")
 
-    if not all_plants:
-        return {
-            "message": "해당 사용자의 식물이 없습니다.",
-            "address": address_to_use,
-            "care_advice": [],
-            "need_plant_identification": True
-        }
+    # plant_name 비교와 조언 캐시 키(plant_key)에 카탈로그가 필요하다.
+    await get_plant_catalog()
+
+    selected = []
+    if plant_name:
+        wanted = plant_key(plant_name)
+        selected = [name for name in all_plants if plant_key(name) == wanted]
+    target_plants = selected or all_plants
+    return address_to_use, target_plants
+
 
-    target_plants = [plant_name] if (plant_name and plant_name in all_plants) else all_plants
+def _no_plants_payload(address: str) -> dict:
+    return {
+        "message": "해당 사용자의 식물이 없습니다.",
+        "address": address,
+        "care_advice": [],
+        "need_plant_identification": True
+    }
+
+
+async def _stale_care_or_raise(user_id: int, address: str, plant_name: Optional[str], error: HTTPException) -> dict:
+    fallback = await last_good_care(user_id, address, plant_name)
+    if fallback is None:
+        raise error
+    print(f"[PlantCare] 마지막 성공 결과로 대체 user={user_id}: {error.detail}")
+    return fallback
+
+
+async def _care_handler(user_id: int, address: Optional[str], plant_name: Optional[str] = None):
+    address_to_use, target_plants = await _resolve_care_target(user_id, address, plant_name)
+    if not target_plants:
+        return _no_plants_payload(address_to_use)
 
     try:
-        lat, lon = get_lat_lon_from_address(address_to_use)
-        weather_info = get_weather_info(lat, lon)
+        lat, lon = await get_lat_lon_from_address(address_to_use)
+        weather_info = await get_weather_info(lat, lon)
         advices = await generate_batch_care_advice(
             target_plants,
             {"temperature": weather_info["temperature"], "weather": weather_info["weather"]}
         )
-        return {
-            "address": address_to_use,
-            "weather": {
-                "기온(°C)": weather_info["temperature"],
-                "습도(%)": weather_info["humidity"],
-                "바람속도(m/s)": weather_info["wind"],
-                "날씨": weather_info["weather"],
-                "강수량(mm, 1시간)": weather_info.get("rain", 0),
-            },
-            "care_advice": advices,
-        }
-    except requests.HTTPError as e:
-        raise HTTPException(status_code=502, detail=f"날씨 API 호출 실패: {e}")
-    except HTTPException:
-        raise
+        payload = build_care_payload(address_to_use, weather_info, advices)
+        if weather_info.get("stale"):
+            payload["stale"] = True
+        _remember_care(user_id, payload)
+        return payload
+    except CircuitOpen as e:
+        return await _stale_care_or_raise(user_id, address_to_use, plant_name, _circuit_open_error(e))
+    except httpx.HTTPError as e:
+        error = HTTPException(status_code=502, detail=f"날씨 API 호출 실패: {e}")
+        return await _stale_care_or_raise(user_id, address_to_use, plant_name, error)
+    except HTTPException as e:
+        if e.status_code < 500:
+            raise
+        return await _stale_care_or_raise(user_id, address_to_use, plant_name, e)
+    except Exception as e:
+        error = HTTPException(status_code=500, detail=f"서버 오류: {e}")
+        return await _stale_care_or_raise(user_id, address_to_use, plant_name, error)
+
+
+def _replay_care(stored: dict) -> StreamingResponse:
+    async def replay():
+        yield _sse("weather", {"address": stored["address"], "weather": stored.get("weather")})
+        for advice in stored.get("care_advice", []):
+            yield _sse("advice", advice)
+        yield _sse("summary", stored)
+    return StreamingResponse(replay(), media_type="text/event-stream", headers=_SSE_HEADERS)
+
+
+async def _care_stream_handler(user_id: int, address: Optional[str], plant_name: Optional[str] = None):
+    # 이벤트 순서: weather -> advice(식물마다) -> summary. 도중 오류는 error 이벤트로 보낸다.
+    stored = await load_current_care(user_id, plant_name) if not address else None
+    if stored is not None:
+        return _replay_care(stored)
+
+    address_to_use, target_plants = await _resolve_care_target(user_id, address, plant_name)
+    if not target_plants:
+        async def empty():
+            yield _sse("summary", _no_plants_payload(address_to_use))
+        return StreamingResponse(empty(), media_type="text/event-stream", headers=_SSE_HEADERS)
+
+    try:
+        lat, lon = await get_lat_lon_from_address(address_to_use)
+        weather_info = await get_weather_info(lat, lon)
+    except CircuitOpen as e:
+        payload = await _stale_care_or_raise(user_id, address_to_use, plant_name, _circuit_open_error(e))
+        return _replay_care(payload)
+    except httpx.HTTPError as e:
+        error = HTTPException(status_code=502, detail=f"날씨 API 호출 실패: {e}")
+        return _replay_care(await _stale_care_or_raise(user_id, address_to_use, plant_name, error))
+    except HTTPException as e:
+        if e.status_code < 500:
+            raise
+        return _replay_care(await _stale_care_or_raise(user_id, address_to_use, plant_name, e))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"서버 오류: {e}")
+        error = HTTPException(status_code=500, detail=f"서버 오류: {e}")
+        return _replay_care(await _stale_care_or_raise(user_id, address_to_use, plant_name, error))
+
+    async def events():
+        payload = build_care_payload(address_to_use, weather_info, [])
+        if weather_info.get("stale"):
+            payload["stale"] = True
+        yield _sse("weather", {"address": address_to_use, "weather": payload["weather"]})
+        by_name = {}
+        try:
+            async for advice in stream_batch_care_advice(
+                target_plants,
+                {"temperature": weather_info["temperature"], "weather": weather_info["weather"]}
+            ):
+                by_name[advice["plant"]] = advice
+                yield _sse("advice", advice)
+        except Exception as e:
+            # 아직 못 받은 식물은 마지막 성공 결과로 채우고, 그것도 없으면 error 이벤트를 보낸다.
+            fallback = await last_good_care(user_id, address_to_use)
+            stale = [
+                a for a in (fallback or {}).get("care_advice", [])
+                if a.get("plant") in target_plants and a.get("plant") not in by_name
+            ]
+            if stale:
+                payload["stale"] = True
+            else:
+                yield _sse("error", {"detail": f"식물 관리 조언 생성 중 오류가 발생했습니다: {e}"})
+            for advice in stale:
+                by_name[advice["plant"]] = advice
+                yield _sse("advice", advice)
+        payload["care_advice"] = [by_name[name] for name in target_plants if name in by_name]
+        _remember_care(user_id, payload)
+        yield _sse("summary", payload)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=_SSE_HEADERS)
+
 
 @app.get("/precommend/plant-care")
 async def get_plant_care_advice_pre(
     user_id: int = Depends(get_user_id_optional),
     address: Optional[str] = None,
-    plant_name: Optional[str] = Query(None)
+    plant_name: Optional[str] = Query(None),
+    stream: bool = Query(False),
 ):
-    return await _care_handler(user_id, address, plant_name)
+    if stream:
+        return await _care_stream_handler(user_id, address, plant_name)
+    return await _cached_care_handler(user_id, address, plant_name)
 
 @app.get("/api/plant-care")
 async def get_plant_care_advice_api(
     request: Request,
     user_id: Optional[int] = Query(None),
     address: Optional[str] = None,
-    plant_name: Optional[str] = Query(None)
+    plant_name: Optional[str] = Query(None),
+    stream: bool = Query(False),
 ):
     uid = get_user_id_optional(request, user_id)
-    return await _care_handler(uid, address, plant_name)
+    if stream:
+        return await _care_stream_handler(uid, address, plant_name)
+    return await _cached_care_handler(uid, address, plant_name)
 
-def _update_address(user_id: int, addr: str):
+def _update_address(user_id: int, addr: str, background_tasks: BackgroundTasks):
     addr = addr.strip()
     if not addr:
         raise HTTPException(status_code=422, detail="주소가 비어 있습니다.")
-    conn = pymysql.connect(**DB_CONFIG)
+    db_pool.execute("UPDATE users SET address = %s WHERE user_id = %s", (addr, user_id))
     try:
-        with conn.cursor() as cursor:
-            cursor.execute("UPDATE users SET address = %s WHERE user_id = %s", (addr, user_id))
-            conn.commit()
-    finally:
-        conn.close()
+        db_pool.execute("DELETE FROM plant_care_results WHERE user_id = %s", (user_id,))
+    except pymysql.MySQLError as e:
+        print(f"[PlantCare] 저장된 결과 삭제 실패: {e}")
+    background_tasks.add_task(_warm_geocode, addr)
     return {"message": "주소가 저장되었습니다.", "address": addr}
 
 @app.patch("/precommend/users/me/address")
 def update_my_address_pre(
     payload: AddressUpdate,
+    background_tasks: BackgroundTasks,
     user_id: int = Depends(get_user_id_optional),
 ):
-    return _update_address(user_id, payload.address)
+    return _update_address(user_id, payload.address, background_tasks)
 
 @app.patch("/api/users/me/address")
 def update_my_address_api(
     request: Request,
     payload: AddressUpdate,
+    background_tasks: BackgroundTasks,
     user_id: Optional[int] = Query(None),
 ):
     uid = get_user_id_optional(request, user_id)
-    return _update_address(uid, payload.address)
+    return _update_address(uid, payload.address, background_tasks)
 
 @app.patch("/users/me/address")
 def update_my_address_root(
     request: Request,
     payload: AddressUpdate,
+    background_tasks: BackgroundTasks,
     user_id: Optional[int] = Query(None),
 ):
     uid = get_user_id_optional(request, user_id)
-    return _update_address(uid, payload.address)
+    return _update_address(uid, payload.address, background_tasks)
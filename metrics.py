@@ -0,0 +1,200 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Sequence, Tuple
+
+_registry: List["_Metric"] = []
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(label, "")) for label in self.labels)
+
+    def _format_labels(self, key: Tuple[str, ...], extra: Optional[Tuple[str, str]] = None) -> str:
+        pairs = list(zip(self.labels, key))
+        if extra:
+            pairs.append(extra)
+        if not pairs:
+            return ""
+        body = ",".join(f'{k}="{_escape(v)}"' for k, v in pairs)
+        return "{" + body + "}"
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        super().__init__(name, help_text, labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        for key, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{self._format_labels(key)} {value}")
+        return lines
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+    DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = (), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(buckets)
+        self._counts: Dict[Tuple[str, ...], List[int]] = {}
+        self._sums: Dict[Tuple[str, ...], float] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._counts.get(key)
+            if counts is None:
+                counts = self._counts[key] = [0] * (len(self.buckets) + 1)
+                self._sums[key] = 0.0
+            counts[index] += 1
+            self._sums[key] += value
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        for key in sorted(self._counts):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), self._counts[key]):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{self.name}_bucket{self._format_labels(key, ('le', le))} {cumulative}")
+            lines.append(f"{self.name}_sum{self._format_labels(key)} {self._sums[key]}")
+            lines.append(f"{self.name}_count{self._format_labels(key)} {cumulative}")
+        return lines
+
+
+def render_latest() -> str:
+    lines: List[str] = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "plantmate_http_request_seconds", "HTTP 요청 처리 시간(응답 시작까지)", ("method", "route", "status")
+)
+HTTP_IN_FLIGHT = Gauge("plantmate_http_in_flight", "처리 중인 HTTP 요청 수")
+STAGE_SECONDS = Histogram("plantmate_stage_seconds", "요청 처리 단계별 소요 시간", ("stage",))
+STAGE_IN_FLIGHT = Gauge("plantmate_stage_in_flight", "진행 중인 단계(DB, 외부 API 호출) 수", ("stage",))
+UPSTREAM_ERRORS = Counter("plantmate_upstream_errors_total", "단계별 외부 호출 실패 수", ("stage",))
+CACHE_REQUESTS = Counter("plantmate_cache_requests_total", "캐시 조회 결과", ("cache", "result"))
+OPENAI_TOKENS = Counter("plantmate_openai_tokens_total", "OpenAI 토큰 사용량", ("kind",))
+
+# 요청마다 (단계 이름, 초) 목록. ServerTimingMiddleware 가 요청 시작 시 새 리스트를 넣는다.
+_request_spans: ContextVar[Optional[List[Tuple[str, float]]]] = ContextVar("request_spans", default=None)
+
+
+@contextmanager
+def stage(name: str):
+    STAGE_IN_FLIGHT.inc(stage=name)
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        UPSTREAM_ERRORS.inc(stage=name)
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_IN_FLIGHT.dec(stage=name)
+        STAGE_SECONDS.observe(elapsed, stage=name)
+        spans = _request_spans.get()
+        if spans is not None:
+            spans.append((name, elapsed))
+
+
+def cache_result(cache: str, result: str, count: int = 1):
+    if count:
+        CACHE_REQUESTS.inc(count, cache=cache, result=result)
+
+
+def record_openai_usage(usage):
+    if usage is None:
+        return
+    OPENAI_TOKENS.inc(getattr(usage, "prompt_tokens", 0) or 0, kind="prompt")
+    OPENAI_TOKENS.inc(getattr(usage, "completion_tokens", 0) or 0, kind="completion")
+
+
+def server_timing_header(spans: List[Tuple[str, float]], total: float) -> str:
+    totals: Dict[str, float] = {}
+    for name, elapsed in list(spans):
+        totals[name] = totals.get(name, 0.0) + elapsed
+    parts = [f"{name};dur={elapsed * 1000:.1f}" for name, elapsed in totals.items()]
+    parts.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(parts)
+
+
+class ServerTimingMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        spans: List[Tuple[str, float]] = []
+        token = _request_spans.set(spans)
+        start = time.perf_counter()
+        status = {"code": 500}
+        HTTP_IN_FLIGHT.inc()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                elapsed = time.perf_counter() - start
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", server_timing_header(spans, elapsed).encode("latin-1")))
+                message = dict(message, headers=headers)
+                route = scope.get("route")
+                HTTP_REQUEST_SECONDS.observe(
+                    elapsed,
+                    method=scope["method"],
+                    route=getattr(route, "path", "unmatched"),
+                    status=status["code"],
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            _request_spans.reset(token)
@@ -0,0 +1,75 @@
+import argparse
+import os
+
+from dotenv import load_dotenv
+import pymysql
+
+load_dotenv()
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+
+
+def db_config() -> dict:
+    return {
+        "host": os.getenv("MYSQL_HOST"),
+        "user": os.getenv("MYSQL_USER"),
+        "password": os.getenv("MYSQL_PASSWORD"),
+        "database": os.getenv("MYSQL_DB"),
+        "autocommit": True,
+    }
+
+
+def split_statements(sql: str):
+    # 마이그레이션 파일은 줄 끝의 세미콜론으로 문장을 구분한다.
+    # 트리거처럼 본문에 세미콜론이 들어가는 문장은 mysql 클라이언트처럼 "DELIMITER $$" 로 구분자를 바꾼다.
+    delimiter = ";"
+    statement = []
+    for line in sql.splitlines():
+        if line.strip().startswith("--"):
+            continue
+        if line.strip().upper().startswith("DELIMITER "):
+            delimiter = line.strip().split(None, 1)[1]
+            continue
+        statement.append(line)
+        if line.rstrip().endswith(delimiter):
+            text = "\n".join(statement).strip()[:-len(delimiter)].strip()
+            if text:
+                yield text
+            statement = []
+    text = "\n".join(statement).strip()
+    if text:
+        yield text
+
+
+def migrate(dry_run: bool = False):
+    files = sorted(f for f in os.listdir(MIGRATIONS_DIR) if f.endswith(".sql"))
+    conn = pymysql.connect(**db_config())
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                "CREATE TABLE IF NOT EXISTS schema_migrations ("
+                "name VARCHAR(255) NOT NULL PRIMARY KEY, applied_at DATETIME NOT NULL)"
+            )
+            cursor.execute("SELECT name FROM schema_migrations")
+            applied = {row[0] for row in cursor.fetchall()}
+            for name in files:
+                if name in applied:
+                    continue
+                print(f"[Migrate] {name}")
+                if dry_run:
+                    continue
+                with open(os.path.join(MIGRATIONS_DIR, name), encoding="utf-8") as f:
+                    for statement in split_statements(f.read()):
+                        cursor.execute(statement)
+                cursor.execute(
+                    "INSERT INTO schema_migrations (name, applied_at) VALUES (%s, NOW())", (name,)
+                )
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="migrations/ 의 SQL 파일을 순서대로 적용합니다.")
+    parser.add_argument("--dry-run", action="store_true", help="적용할 파일 목록만 출력")
+    args = parser.parse_args()
+    migrate(args.dry_run)
@@ -0,0 +1,7 @@
+CREATE TABLE IF NOT EXISTS plant_care_results (
+    user_id INT NOT NULL PRIMARY KEY,
+    address VARCHAR(200) NOT NULL,
+    payload MEDIUMTEXT NOT NULL,
+    generated_at DATETIME NOT NULL,
+    INDEX idx_plant_care_results_generated_at (generated_at)
+) DEFAULT CHARSET = utf8mb4;
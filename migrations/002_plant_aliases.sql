@@ -0,0 +1,48 @@
+CREATE TABLE IF NOT EXISTS plant_aliases (
+    alias VARCHAR(100) NOT NULL PRIMARY KEY,
+    plant_id INT NOT NULL,
+    INDEX idx_plant_aliases_plant_id (plant_id)
+) DEFAULT CHARSET = utf8mb4;
+
+-- 자주 쓰이는 영문명/학명/유통명. plants 에 있는 식물에만 들어간다.
+INSERT IGNORE INTO plant_aliases (alias, plant_id)
+SELECT a.alias, p.plant_id
+FROM plants p
+JOIN (
+    SELECT '몬스테라' AS plant_name, 'monstera' AS alias
+    UNION ALL SELECT '몬스테라', 'monstera deliciosa'
+    UNION ALL SELECT '몬스테라', '몬스테라 델리시오사'
+    UNION ALL SELECT '스투키', 'sansevieria cylindrica'
+    UNION ALL SELECT '스투키', 'stuckyi'
+    UNION ALL SELECT '스킨답서스', 'pothos'
+    UNION ALL SELECT '스킨답서스', 'epipremnum aureum'
+    UNION ALL SELECT '스킨답서스', '포토스'
+    UNION ALL SELECT '금전수', 'zz plant'
+    UNION ALL SELECT '금전수', 'zamioculcas'
+    UNION ALL SELECT '금전수', '돈나무'
+    UNION ALL SELECT '산세베리아', 'sansevieria'
+    UNION ALL SELECT '산세베리아', 'snake plant'
+    UNION ALL SELECT '고무나무', 'rubber plant'
+    UNION ALL SELECT '고무나무', 'ficus elastica'
+    UNION ALL SELECT '떡갈고무나무', 'fiddle leaf fig'
+    UNION ALL SELECT '떡갈고무나무', 'ficus lyrata'
+    UNION ALL SELECT '테이블야자', 'parlor palm'
+    UNION ALL SELECT '테이블야자', 'chamaedorea elegans'
+    UNION ALL SELECT '아레카야자', 'areca palm'
+    UNION ALL SELECT '스파티필룸', 'peace lily'
+    UNION ALL SELECT '스파티필룸', 'spathiphyllum'
+    UNION ALL SELECT '아이비', 'ivy'
+    UNION ALL SELECT '아이비', 'hedera helix'
+    UNION ALL SELECT '행운목', 'dracaena fragrans'
+    UNION ALL SELECT '필레아 페페로미오이데스', 'pilea peperomioides'
+    UNION ALL SELECT '필레아 페페로미오이데스', '필레아'
+    UNION ALL SELECT '칼라데아', 'calathea'
+    UNION ALL SELECT '올리브나무', 'olive tree'
+    UNION ALL SELECT '호야', 'hoya'
+    UNION ALL SELECT '디펜바키아', 'dieffenbachia'
+    UNION ALL SELECT '여인초', 'bird of paradise'
+    UNION ALL SELECT '여인초', 'strelitzia'
+    UNION ALL SELECT '알로카시아', 'alocasia'
+    UNION ALL SELECT '틸란드시아', 'tillandsia'
+    UNION ALL SELECT '틸란드시아', 'air plant'
+) a ON a.plant_name = p.plant_name;
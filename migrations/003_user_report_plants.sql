@@ -0,0 +1,72 @@
+-- 사용자별 성장 리포트 식물 목록을 미리 모아 둔다. list_my_plants 가 리포트 전체를 DISTINCT 하지 않고
+-- (user_id, plant_name) 기본 키 범위만 읽도록 한다. 리포트 쓰기는 다른 서비스가 하므로 트리거로 맞춘다.
+CREATE TABLE IF NOT EXISTS user_report_plants (
+    user_id INT NOT NULL,
+    plant_name VARCHAR(255) NOT NULL,
+    report_count INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, plant_name)
+) DEFAULT CHARSET = utf8mb4;
+
+DROP TRIGGER IF EXISTS trg_user_report_plants_insert;
+DROP TRIGGER IF EXISTS trg_user_report_plants_update;
+DROP TRIGGER IF EXISTS trg_user_report_plants_delete;
+
+DELIMITER $$
+
+CREATE TRIGGER trg_user_report_plants_insert
+AFTER INSERT ON user_plant_growth_reports
+FOR EACH ROW
+BEGIN
+    IF NEW.plant_name IS NOT NULL AND NEW.plant_name <> '' THEN
+        INSERT INTO user_report_plants (user_id, plant_name, report_count)
+        VALUES (NEW.user_id, NEW.plant_name, 1)
+        ON DUPLICATE KEY UPDATE report_count = report_count + 1;
+    END IF;
+END$$
+
+CREATE TRIGGER trg_user_report_plants_update
+AFTER UPDATE ON user_plant_growth_reports
+FOR EACH ROW
+BEGIN
+    IF NOT (OLD.user_id <=> NEW.user_id) OR NOT (OLD.plant_name <=> NEW.plant_name) THEN
+        IF OLD.plant_name IS NOT NULL AND OLD.plant_name <> '' THEN
+            UPDATE user_report_plants
+            SET report_count = report_count - 1
+            WHERE user_id = OLD.user_id AND plant_name = OLD.plant_name;
+            DELETE FROM user_report_plants
+            WHERE user_id = OLD.user_id AND plant_name = OLD.plant_name AND report_count <= 0;
+        END IF;
+        IF NEW.plant_name IS NOT NULL AND NEW.plant_name <> '' THEN
+            INSERT INTO user_report_plants (user_id, plant_name, report_count)
+            VALUES (NEW.user_id, NEW.plant_name, 1)
+            ON DUPLICATE KEY UPDATE report_count = report_count + 1;
+        END IF;
+    END IF;
+END$$
+
+CREATE TRIGGER trg_user_report_plants_delete
+AFTER DELETE ON user_plant_growth_reports
+FOR EACH ROW
+BEGIN
+    IF OLD.plant_name IS NOT NULL AND OLD.plant_name <> '' THEN
+        UPDATE user_report_plants
+        SET report_count = report_count - 1
+        WHERE user_id = OLD.user_id AND plant_name = OLD.plant_name;
+        DELETE FROM user_report_plants
+        WHERE user_id = OLD.user_id AND plant_name = OLD.plant_name AND report_count <= 0;
+    END IF;
+END$$
+
+DELIMITER ;
+
+-- 트리거를 먼저 만든 뒤 기존 리포트로 채운다.
+INSERT INTO user_report_plants (user_id, plant_name, report_count)
+SELECT user_id, plant_name, COUNT(*)
+FROM user_plant_growth_reports
+WHERE plant_name IS NOT NULL
+  AND plant_name <> ''
+GROUP BY user_id, plant_name
+ON DUPLICATE KEY UPDATE report_count = VALUES(report_count);
+
+-- user_plants 쪽 대체 경로가 user_id 로 바로 찾고 plant_id 까지 인덱스만으로 읽게 한다.
+CREATE INDEX idx_user_plants_user_plant ON user_plants (user_id, plant_id);
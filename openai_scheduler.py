@@ -0,0 +1,271 @@
+import asyncio
+import random
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, Deque, Dict, Optional, Tuple, TypeVar
+
+from openai import APIConnectionError, InternalServerError, RateLimitError
+
+from metrics import Counter, Gauge, stage
+
+T = TypeVar("T")
+
+SCHEDULER_LIMIT = Gauge("plantmate_openai_concurrency_limit", "OpenAI 동시 호출 한도(적응형)")
+SCHEDULER_IN_FLIGHT = Gauge("plantmate_openai_in_flight", "진행 중인 OpenAI 호출 수")
+SCHEDULER_QUEUED = Gauge("plantmate_openai_queued", "OpenAI 호출 대기열 길이")
+SCHEDULER_SHED = Counter("plantmate_openai_shed_total", "대기열에서 거절된 OpenAI 호출 수", ("reason",))
+SCHEDULER_RETRIES = Counter("plantmate_openai_retries_total", "OpenAI 재시도 횟수", ("reason",))
+
+
+class Overloaded(Exception):
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def estimate_tokens(messages, max_output_tokens: int) -> int:
+    # 한국어 프롬프트는 대략 2글자당 1토큰. 실제 사용량은 응답의 usage 로 다시 맞춘다.
+    chars = sum(len(str(message.get("content", ""))) for message in messages)
+    return chars // 2 + max_output_tokens
+
+
+def _retry_after(exc: Exception) -> Optional[float]:
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except ValueError:
+        return None
+    return None
+
+
+class Permit:
+    def __init__(self, scheduler: "OpenAIScheduler", tokens: int, deadline: float, kind: str):
+        self._scheduler = scheduler
+        self.tokens = tokens
+        self.deadline = deadline
+        self.kind = kind
+        self.granted_at = time.monotonic()
+        self.used_tokens: Optional[int] = None
+
+    def record_usage(self, usage):
+        total = getattr(usage, "total_tokens", None)
+        if total:
+            self.used_tokens = (self.used_tokens or 0) + total
+
+    async def run(self, call: Callable[[], Awaitable[T]]) -> T:
+        # 재시도 대기 중에도 슬롯을 쥐고 있어서, 429 가 나는 동안에는 새 요청이 그만큼 덜 나간다.
+        # openai 단계는 실제 API 호출만 잰다. 대기열(openai_queue)과 재시도 대기, 이쪽에서 내린 Overloaded 는 빠진다.
+        attempt = 0
+        while True:
+            started = time.monotonic()
+            try:
+                with stage("openai"):
+                    result = await call()
+            except RateLimitError as e:
+                self._scheduler._on_rate_limited()
+                await self._backoff(attempt, e, "rate_limit")
+            except (APIConnectionError, InternalServerError) as e:
+                await self._backoff(attempt, e, "upstream")
+            else:
+                self._scheduler._on_success(self.kind, time.monotonic() - started)
+                return result
+            attempt += 1
+
+    async def _backoff(self, attempt: int, exc: Exception, reason: str):
+        scheduler = self._scheduler
+        if attempt >= scheduler.max_retries:
+            raise exc
+        delay = random.uniform(0, min(scheduler.backoff_cap, scheduler.backoff_base * 2 ** attempt))
+        hinted = _retry_after(exc)
+        if hinted is not None:
+            delay = max(delay, hinted)
+        if time.monotonic() + delay > self.deadline:
+            SCHEDULER_SHED.inc(reason="retry_deadline")
+            raise Overloaded("OpenAI 호출 제한으로 요청을 처리할 수 없습니다. 잠시 후 다시 시도해 주세요.", delay) from exc
+        SCHEDULER_RETRIES.inc(reason=reason)
+        await asyncio.sleep(delay)
+
+
+class OpenAIScheduler:
+    def __init__(
+        self,
+        concurrency: int = 8,
+        min_concurrency: int = 1,
+        max_concurrency: int = 32,
+        tokens_per_minute: int = 30000,
+        max_queue: int = 100,
+        queue_timeout: float = 20.0,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_cap: float = 8.0,
+        latency_tolerance: float = 3.0,
+    ):
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.latency_tolerance = latency_tolerance
+
+        self._limit = float(max(min_concurrency, min(concurrency, max_concurrency)))
+        self._in_flight = 0
+        self._waiters: Deque[Tuple[asyncio.Future, int]] = deque()
+        self._token_rate = tokens_per_minute / 60.0
+        self._token_capacity = float(tokens_per_minute)
+        self._tokens = self._token_capacity
+        self._tokens_at = time.monotonic()
+        # 스트리밍은 헤더까지, 일반 호출은 생성 끝까지의 시간이라 같은 기준으로 비교할 수 없다.
+        # 지연 기준은 호출 종류별로 따로 두고, 대기 시간 예측에는 실제로 슬롯을 쥐고 있던 시간을 쓴다.
+        self._latency: Dict[str, float] = {}
+        self._min_latency: Dict[str, float] = {}
+        self._hold_time: Optional[float] = None
+        self._last_decrease = 0.0
+        self._wakeup: Optional[asyncio.TimerHandle] = None
+        SCHEDULER_LIMIT.set(self._limit)
+
+    @property
+    def limit(self) -> int:
+        return max(1, int(self._limit))
+
+    @asynccontextmanager
+    async def admit(self, tokens: int, timeout: Optional[float] = None, kind: str = "completion"):
+        deadline = time.monotonic() + (self.queue_timeout if timeout is None else timeout)
+        await self._acquire(tokens, deadline)
+        permit = Permit(self, tokens, deadline, kind)
+        try:
+            yield permit
+        finally:
+            self._release(permit)
+
+    async def call(
+        self, call: Callable[[], Awaitable[T]], tokens: int, timeout: Optional[float] = None, kind: str = "completion"
+    ) -> T:
+        async with self.admit(tokens, timeout, kind) as permit:
+            result = await permit.run(call)
+            permit.record_usage(getattr(result, "usage", None))
+            return result
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self._token_capacity, self._tokens + (now - self._tokens_at) * self._token_rate)
+        self._tokens_at = now
+
+    def _expected_wait(self, tokens: int) -> float:
+        # 앞선 대기 요청이 한도만큼씩 빠져나간다고 보고, 토큰 예산이 모자라면 충전 시간도 더한다.
+        latency = self._hold_time or 0.0
+        rounds = (len(self._waiters) + max(0, self._in_flight - self.limit + 1)) / self.limit
+        queued_tokens = sum(t for _, t in self._waiters) + tokens
+        self._refill()
+        token_wait = max(0.0, queued_tokens - self._tokens) / self._token_rate if self._token_rate else 0.0
+        return max(rounds * latency, token_wait)
+
+    def _shed(self, reason: str, retry_after: float):
+        SCHEDULER_SHED.inc(reason=reason)
+        raise Overloaded("요청이 많아 식물 도우미가 잠시 바쁩니다. 잠시 후 다시 시도해 주세요.", retry_after)
+
+    async def _acquire(self, tokens: int, deadline: float):
+        if len(self._waiters) >= self.max_queue:
+            self._shed("queue_full", self._hold_time or 1.0)
+        remaining = deadline - time.monotonic()
+        expected = self._expected_wait(tokens)
+        if expected > remaining:
+            self._shed("deadline", expected)
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append((future, tokens))
+        SCHEDULER_QUEUED.inc()
+        self._dispatch()
+        try:
+            with stage("openai_queue"):
+                done, _ = await asyncio.wait({future}, timeout=max(0.0, deadline - time.monotonic()))
+        except asyncio.CancelledError:
+            self._abandon(future, tokens)
+            raise
+        if not done:
+            self._abandon(future, tokens)
+            self._shed("timeout", self._expected_wait(tokens))
+
+    def _abandon(self, future: asyncio.Future, tokens: int):
+        if future.done() and not future.cancelled():
+            # 슬롯을 받은 직후에 취소된 경우: 받은 슬롯을 바로 돌려준다.
+            self._in_flight -= 1
+            SCHEDULER_IN_FLIGHT.dec()
+            self._tokens += tokens
+            self._dispatch()
+            return
+        future.cancel()
+        try:
+            self._waiters.remove((future, tokens))
+            SCHEDULER_QUEUED.dec()
+        except ValueError:
+            pass
+
+    def _dispatch(self):
+        self._refill()
+        while self._waiters and self._in_flight < self.limit:
+            future, tokens = self._waiters[0]
+            if future.done():
+                self._waiters.popleft()
+                SCHEDULER_QUEUED.dec()
+                continue
+            # 예산보다 큰 요청은 버킷이 가득 찼을 때 통과시켜 영원히 굶지 않게 한다.
+            if self._tokens < min(tokens, self._token_capacity):
+                self._schedule_wakeup((min(tokens, self._token_capacity) - self._tokens) / self._token_rate)
+                return
+            self._waiters.popleft()
+            SCHEDULER_QUEUED.dec()
+            self._tokens -= tokens
+            self._in_flight += 1
+            SCHEDULER_IN_FLIGHT.inc()
+            future.set_result(None)
+
+    def _schedule_wakeup(self, delay: float):
+        if self._wakeup is not None and not self._wakeup.cancelled():
+            self._wakeup.cancel()
+        loop = asyncio.get_running_loop()
+        self._wakeup = loop.call_later(max(delay, 0.01), self._dispatch)
+
+    def _release(self, permit: Permit):
+        held = time.monotonic() - permit.granted_at
+        self._hold_time = held if self._hold_time is None else 0.8 * self._hold_time + 0.2 * held
+        self._in_flight -= 1
+        SCHEDULER_IN_FLIGHT.dec()
+        if permit.used_tokens is not None:
+            self._tokens += permit.tokens - permit.used_tokens
+        self._dispatch()
+
+    def _set_limit(self, value: float):
+        self._limit = max(self.min_concurrency, min(self.max_concurrency, value))
+        SCHEDULER_LIMIT.set(self._limit)
+
+    def _on_rate_limited(self):
+        # 동시에 돌아온 429 여러 개로 한도를 연달아 반으로 줄이지 않도록, 한 응답 시간에 한 번만 줄인다.
+        now = time.monotonic()
+        if now - self._last_decrease >= (self._hold_time or 1.0):
+            self._last_decrease = now
+            self._set_limit(self._limit / 2)
+
+    def _on_success(self, kind: str, latency: float):
+        average = self._latency.get(kind)
+        average = latency if average is None else 0.8 * average + 0.2 * latency
+        self._latency[kind] = average
+        baseline = self._min_latency.get(kind)
+        if baseline is None or latency < baseline:
+            baseline = latency
+        else:
+            # 기준 지연은 천천히 올려서, 상류가 영구적으로 느려진 경우에도 따라가게 한다.
+            baseline *= 1.01
+        self._min_latency[kind] = baseline
+        if average <= baseline * self.latency_tolerance:
+            self._set_limit(self._limit + 1 / self._limit)
+        else:
+            self._set_limit(self._limit * 0.95)
@@ -0,0 +1,131 @@
+import re
+import unicodedata
+from array import array
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+_BRACKETS = re.compile(r"\([^)]*\)|\[[^\]]*\]")
+_NOISE = re.compile(r"[^0-9a-zᄀ-ᇿㄱ-ㆎ가-힣]+")
+
+
+def normalize_name(name: str) -> str:
+    # 괄호 속 설명, 공백, 기호를 지우고 소문자로 맞춘다. "몬스테라 (Monstera)" -> "몬스테라"
+    return _NOISE.sub("", _BRACKETS.sub("", unicodedata.normalize("NFKC", name).lower()))
+
+
+def to_jamo(text: str) -> str:
+    # 한글 음절을 초/중/종성 자모로 풀어서 "몬스테러" 같은 한 글자 오타도 대부분의 n-gram 이 겹치게 한다.
+    return unicodedata.normalize("NFD", text)
+
+
+def ngrams(text: str, n: int = 3) -> List[str]:
+    if len(text) <= n:
+        return [text] if text else []
+    return [text[i:i + n] for i in range(len(text) - n + 1)]
+
+
+@dataclass
+class CatalogEntry:
+    plant_id: int
+    name: str
+    image_url: Optional[str] = None
+
+
+class PlantCatalog:
+    # plants 테이블의 이름과 plant_aliases 의 별칭을 자모 3-gram 역색인으로 들고 있다가,
+    # 자유 입력 이름을 plant_id 로 바꿔 준다. 정확히 같은 이름은 dict 한 번으로 끝나고,
+    # 나머지는 겹치는 n-gram 수로 점수를 매겨 threshold 이상인 가장 좋은 항목을 고른다.
+    # 이 결과가 조언 캐시 키가 되므로 한두 글자 오타만 받아 준다. 다른 식물 이름을 품은 이름
+    # ("아이비제라늄", "테이블")은 길이 비율에서 걸러 내고, 같은 식물의 다른 이름은 plant_aliases 로 등록한다.
+
+    def __init__(
+        self,
+        plants: Iterable[Tuple[int, str]] = (),
+        aliases: Iterable[Tuple[int, str]] = (),
+        threshold: float = 0.7,
+        memo_size: int = 8192,
+        min_length_ratio: float = 0.75,
+    ):
+        self.threshold = threshold
+        self.min_length_ratio = min_length_ratio
+        self.entries: Dict[int, CatalogEntry] = {}
+        self._exact: Dict[str, int] = {}
+        self._key_ids = array("I")
+        self._key_sizes = array("H")
+        self._postings: Dict[str, array] = {}
+        self._memo: "OrderedDict[str, Optional[int]]" = OrderedDict()
+        self._memo_size = memo_size
+        for plant_id, name in plants:
+            if name:
+                self.entries.setdefault(int(plant_id), CatalogEntry(int(plant_id), name))
+                self._add_key(int(plant_id), name)
+        for plant_id, alias in aliases:
+            if alias and int(plant_id) in self.entries:
+                self._add_key(int(plant_id), alias)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _add_key(self, plant_id: int, name: str):
+        key = normalize_name(name)
+        if not key or key in self._exact:
+            return
+        self._exact[key] = plant_id
+        index = len(self._key_ids)
+        grams = set(ngrams(to_jamo(key)))
+        self._key_ids.append(plant_id)
+        self._key_sizes.append(min(len(grams), 0xFFFF))
+        for gram in grams:
+            self._postings.setdefault(gram, array("I")).append(index)
+
+    def resolve(self, name: str) -> Optional[int]:
+        key = normalize_name(name or "")
+        if not key:
+            return None
+        plant_id = self._exact.get(key)
+        if plant_id is not None:
+            return plant_id
+        if key in self._memo:
+            self._memo.move_to_end(key)
+            return self._memo[key]
+        plant_id = self._fuzzy(key)
+        self._memo[key] = plant_id
+        if len(self._memo) > self._memo_size:
+            self._memo.popitem(last=False)
+        return plant_id
+
+    def _fuzzy(self, key: str) -> Optional[int]:
+        grams = set(ngrams(to_jamo(key)))
+        if not grams:
+            return None
+        common: Dict[int, int] = {}
+        for gram in grams:
+            for index in self._postings.get(gram, ()):
+                common[index] = common.get(index, 0) + 1
+        best, best_score, best_size = None, 0.0, 0
+        for index, shared in common.items():
+            size = self._key_sizes[index]
+            if min(len(grams), size) < self.min_length_ratio * max(len(grams), size):
+                continue
+            score = 2 * shared / (len(grams) + size)
+            if score > best_score or (score == best_score and size > best_size):
+                best, best_score, best_size = index, score, size
+        if best is None or best_score < self.threshold:
+            return None
+        return self._key_ids[best]
+
+    def entry(self, name: str) -> Optional[CatalogEntry]:
+        plant_id = self.resolve(name)
+        return self.entries.get(plant_id) if plant_id is not None else None
+
+    def canonical_name(self, name: str) -> str:
+        entry = self.entry(name)
+        return entry.name if entry is not None else name
+
+    def key(self, name: str) -> str:
+        # 캐시 키. 카탈로그에 있으면 plant_id 기준, 없으면 정규화한 이름 그대로.
+        plant_id = self.resolve(name)
+        if plant_id is not None:
+            return f"#{plant_id}"
+        return normalize_name(name or "") or (name or "").strip().lower()
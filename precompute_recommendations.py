@@ -0,0 +1,60 @@
+import argparse
+import asyncio
+import itertools
+
+import main
+
+
+def iter_environment_inputs():
+    for south, north, east, west, blinds in itertools.product((False, True), repeat=5):
+        for location in main.PLANT_LOCATIONS:
+            for water in main.WATER_FREQUENCIES:
+                yield main.EnvironmentInput(
+                    has_south_sun=south,
+                    has_north_sun=north,
+                    has_east_sun=east,
+                    has_west_sun=west,
+                    plant_location=location,
+                    has_blinds_curtains=blinds,
+                    water_frequency=water,
+                )
+
+
+async def rebuild(variants: int, concurrency: int, force: bool):
+    semaphore = asyncio.Semaphore(concurrency)
+    generated = 0
+    failed = 0
+
+    async def fill(env_input: main.EnvironmentInput):
+        nonlocal generated, failed
+        key = main.recommendation_key(env_input)
+        missing = variants if force else variants - main._recommendation_table.count(key)
+        for _ in range(max(missing, 0)):
+            async with semaphore:
+                try:
+                    await main.store_generated_recommendations(key, env_input, variants)
+                    generated += 1
+                except Exception as e:
+                    failed += 1
+                    print(f"[Precompute] {key} 생성 실패: {e}")
+
+    inputs = list(iter_environment_inputs())
+    try:
+        await asyncio.gather(*(fill(env_input) for env_input in inputs))
+    finally:
+        await main.close_http_clients()
+    print(f"[Precompute] 환경 조합 {len(inputs)}개, 생성 {generated}건, 실패 {failed}건")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="EnvironmentInput 전체 조합에 대한 추천 결과를 미리 생성합니다.")
+    parser.add_argument("--variants", type=int, default=main.RECOMMEND_TABLE_VARIANTS,
+                        help="조합마다 보관할 추천 변형 수")
+    parser.add_argument("--concurrency", type=int, default=4, help="동시에 실행할 OpenAI 호출 수")
+    parser.add_argument("--force", action="store_true", help="기존 변형이 있어도 모두 새로 생성")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    asyncio.run(rebuild(args.variants, args.concurrency, args.force))
@@ -0,0 +1,52 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import List, Tuple
+
+
+# 환경 조합 키마다 여러 개의 추천 결과(변형)를 보관하는 사전 계산 테이블
+class RecommendationTable:
+    def __init__(self, path: str):
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS recommendations ("
+            "env_key TEXT NOT NULL, payload TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS recommendations_env_key ON recommendations (env_key, created_at)"
+        )
+
+    def variants(self, env_key: str) -> List[Tuple[list, float]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT payload, created_at FROM recommendations WHERE env_key = ? ORDER BY created_at",
+                (env_key,),
+            ).fetchall()
+        return [(json.loads(payload), created_at) for payload, created_at in rows]
+
+    def count(self, env_key: str) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM recommendations WHERE env_key = ?", (env_key,)
+            ).fetchone()[0]
+
+    def add(self, env_key: str, payload: list, max_variants: int):
+        # 변형 수가 max_variants 를 넘으면 가장 오래된 것부터 지운다.
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO recommendations (env_key, payload, created_at) VALUES (?, ?, ?)",
+                (env_key, json.dumps(payload, ensure_ascii=False), time.time()),
+            )
+            self._conn.execute(
+                "DELETE FROM recommendations WHERE env_key = ? AND rowid NOT IN ("
+                "SELECT rowid FROM recommendations WHERE env_key = ? "
+                "ORDER BY created_at DESC LIMIT ?)",
+                (env_key, env_key, max_variants),
+            )
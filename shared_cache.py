@@ -0,0 +1,409 @@
+import argparse
+import asyncio
+import fcntl
+import hashlib
+import json
+import mmap
+import os
+import socket
+import struct
+import threading
+import time
+from typing import Any, Hashable, List, Optional, Sequence, Tuple
+
+from caches import LRUCache
+from metrics import Counter
+
+SHARED_CACHE_DROPPED = Counter(
+    "plantmate_shared_cache_dropped_total",
+    "공유 캐시에 저장하지 못한 항목 수 (oversize=슬롯보다 큼, unavailable=캐시 서버 응답 없음)",
+    ("cache", "reason"),
+)
+
+# 워커 여러 개가 같은 호스트에서 함께 쓰는 캐시.
+#   memory: 프로세스마다 따로 가지는 LRUCache (기본값)
+#   mmap:   CACHE_DIR 아래 파일을 mmap 한 고정 크기 해시 테이블. 같은 호스트의 모든 워커가 공유한다.
+#   tcp:    여러 서버가 함께 쓰는 간단한 캐시 서버(python shared_cache.py serve)에 붙는다.
+# 세 가지 모두 get(key, default) / set(key, value, ttl) / delete(key) / clear() 만 쓴다.
+# 이벤트 루프에서는 aget / aget_many / aset 을 쓴다. tcp 는 네트워크 왕복을 스레드로 넘기고,
+# 나머지는 같은 프로세스 안의 짧은 작업이라 바로 실행한다.
+# 값은 JSON 으로 저장하므로 튜플은 리스트로 돌아온다.
+
+_HEADER = struct.Struct("<8sIII")
+_HEADER_SIZE = 64
+_MAGIC = b"PMCACHE1"
+# used, key_len, value_len, key_hash, expires_at(0=만료 없음), last_access
+_SLOT = struct.Struct("<BxHIQdd")
+
+
+def _encode_key(key: Hashable) -> bytes:
+    return json.dumps(key, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _hash(key_bytes: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(key_bytes, digest_size=8).digest(), "little")
+
+
+class _AsyncAccess:
+    async def aget(self, key: Hashable, default: Any = None) -> Any:
+        return self.get(key, default)
+
+    async def aget_many(self, keys: Sequence[Hashable], default: Any = None) -> List[Any]:
+        return [self.get(key, default) for key in keys]
+
+    async def aset(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        self.set(key, value, ttl)
+
+
+class MemoryCache(_AsyncAccess, LRUCache):
+    pass
+
+
+class CacheGeometryMismatch(ValueError):
+    pass
+
+
+class MmapCache(_AsyncAccess):
+    # 슬롯 ways 개를 한 버킷으로 묶은 고정 크기 해시 테이블. 키는 해시로 버킷 하나에만 들어가고,
+    # 버킷이 차면 그 안에서 가장 오래 안 쓴 슬롯을 덮어쓴다(버킷 단위 근사 LRU).
+    # 프로세스 사이는 버킷 바이트 범위에 거는 fcntl 레코드 락(읽기 공유/쓰기 배타)으로,
+    # 같은 프로세스의 스레드 사이는 threading.Lock 으로 막는다.
+
+    def __init__(self, path: str, maxsize: int = 4096, ttl: Optional[float] = None,
+                 slot_size: int = 2048, ways: int = 8, name: Optional[str] = None):
+        self.path = path
+        self.name = name or os.path.splitext(os.path.basename(path))[0]
+        self.ttl = ttl
+        self.ways = ways
+        self.slot_size = slot_size
+        self.buckets = max(1, -(-maxsize // ways))
+        self.slots = self.buckets * ways
+        self._size = _HEADER_SIZE + self.slots * slot_size
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        fcntl.lockf(self._fd, fcntl.LOCK_EX)
+        try:
+            expected = _HEADER.pack(_MAGIC, self.slots, slot_size, ways)
+            if os.fstat(self._fd).st_size == 0:
+                # 크기 0 인 파일은 아무도 mmap 할 수 없으니 여기서 처음 만드는 것이 안전하다.
+                os.ftruncate(self._fd, self._size)
+                os.pwrite(self._fd, expected, 0)
+            elif os.pread(self._fd, _HEADER.size, 0) != expected or os.fstat(self._fd).st_size != self._size:
+                # 다른 워커가 이미 mmap 하고 있을 수 있는 파일을 줄이면 그쪽이 SIGBUS 로 죽는다.
+                # 크기 설정이 다른 파일은 건드리지 않고 거절한다.
+                raise CacheGeometryMismatch(f"{path} 의 슬롯 구성이 설정과 다릅니다.")
+        except BaseException:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            raise
+        fcntl.lockf(self._fd, fcntl.LOCK_UN)
+        self._map = mmap.mmap(self._fd, self._size)
+
+    def _bucket(self, key_hash: int) -> Tuple[int, int]:
+        start = _HEADER_SIZE + (key_hash % self.buckets) * self.ways * self.slot_size
+        return start, self.ways * self.slot_size
+
+    def _locked(self, key_hash: int, exclusive: bool):
+        start, length = self._bucket(key_hash)
+        return _RangeLock(self._fd, self._lock, start, length, exclusive)
+
+    def _find(self, start: int, key_hash: int, key_bytes: bytes) -> Optional[int]:
+        for offset in range(start, start + self.ways * self.slot_size, self.slot_size):
+            used, key_len, _, slot_hash, _, _ = _SLOT.unpack_from(self._map, offset)
+            if used and slot_hash == key_hash:
+                key_start = offset + _SLOT.size
+                if self._map[key_start:key_start + key_len] == key_bytes:
+                    return offset
+        return None
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        key_bytes = _encode_key(key)
+        key_hash = _hash(key_bytes)
+        start, _ = self._bucket(key_hash)
+        with self._locked(key_hash, exclusive=False):
+            offset = self._find(start, key_hash, key_bytes)
+            if offset is None:
+                return default
+            _, key_len, value_len, _, expires_at, _ = _SLOT.unpack_from(self._map, offset)
+            now = time.time()
+            if expires_at and expires_at <= now:
+                return default
+            value_start = offset + _SLOT.size + key_len
+            value = bytes(self._map[value_start:value_start + value_len])
+            # 마지막 사용 시각은 근사값이라 공유 락 아래에서 덮어써도 괜찮다.
+            struct.pack_into("<d", self._map, offset + _SLOT.size - 8, now)
+        try:
+            return json.loads(value)
+        except ValueError:
+            return default
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> bool:
+        key_bytes = _encode_key(key)
+        value_bytes = json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        if _SLOT.size + len(key_bytes) + len(value_bytes) > self.slot_size:
+            SHARED_CACHE_DROPPED.inc(cache=self.name, reason="oversize")
+            return False
+        ttl = self.ttl if ttl is None else ttl
+        now = time.time()
+        expires_at = now + ttl if ttl is not None else 0.0
+        key_hash = _hash(key_bytes)
+        start, _ = self._bucket(key_hash)
+        with self._locked(key_hash, exclusive=True):
+            offset = self._find(start, key_hash, key_bytes)
+            if offset is None:
+                offset = self._victim(start, now)
+            payload = offset + _SLOT.size
+            self._map[payload:payload + len(key_bytes)] = key_bytes
+            self._map[payload + len(key_bytes):payload + len(key_bytes) + len(value_bytes)] = value_bytes
+            _SLOT.pack_into(self._map, offset, 1, len(key_bytes), len(value_bytes), key_hash, expires_at, now)
+        return True
+
+    def _victim(self, start: int, now: float) -> int:
+        victim, oldest = start, None
+        for offset in range(start, start + self.ways * self.slot_size, self.slot_size):
+            used, _, _, _, expires_at, last_access = _SLOT.unpack_from(self._map, offset)
+            if not used or (expires_at and expires_at <= now):
+                return offset
+            if oldest is None or last_access < oldest:
+                victim, oldest = offset, last_access
+        return victim
+
+    def delete(self, key: Hashable):
+        key_bytes = _encode_key(key)
+        key_hash = _hash(key_bytes)
+        start, _ = self._bucket(key_hash)
+        with self._locked(key_hash, exclusive=True):
+            offset = self._find(start, key_hash, key_bytes)
+            if offset is not None:
+                self._map[offset] = 0
+
+    def clear(self):
+        with _RangeLock(self._fd, self._lock, _HEADER_SIZE, self.slots * self.slot_size, True):
+            for offset in range(_HEADER_SIZE, self._size, self.slot_size):
+                self._map[offset] = 0
+
+    def close(self):
+        self._map.close()
+        os.close(self._fd)
+
+
+class _RangeLock:
+    def __init__(self, fd: int, thread_lock: threading.Lock, start: int, length: int, exclusive: bool):
+        self.fd = fd
+        self.thread_lock = thread_lock
+        self.start = start
+        self.length = length
+        self.exclusive = exclusive
+
+    def __enter__(self):
+        self.thread_lock.acquire()
+        try:
+            fcntl.lockf(self.fd, fcntl.LOCK_EX if self.exclusive else fcntl.LOCK_SH, self.length, self.start)
+        except BaseException:
+            self.thread_lock.release()
+            raise
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            fcntl.lockf(self.fd, fcntl.LOCK_UN, self.length, self.start)
+        finally:
+            self.thread_lock.release()
+        return False
+
+
+class TcpCache(_AsyncAccess):
+    # 캐시 서버에 한 줄짜리 JSON 으로 묻는다. 서버가 없거나 느리면 캐시 미스처럼 동작해서
+    # 캐시 장애가 요청 실패로 번지지 않게 한다. 연결에 실패하면 retry_after 동안은 서버에 묻지 않고
+    # 바로 미스로 돌려서, 응답 없는 서버 때문에 요청마다 timeout 만큼 기다리지 않는다.
+
+    def __init__(self, address: str, namespace: str, ttl: Optional[float] = None, timeout: float = 0.2,
+                 retry_after: float = 5.0, max_idle: int = 8):
+        host, _, port = address.rpartition(":")
+        self.address = (host or "127.0.0.1", int(port))
+        self.namespace = namespace
+        self.ttl = ttl
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self.max_idle = max_idle
+        self._lock = threading.Lock()
+        self._idle: List[Tuple[socket.socket, Any]] = []
+        self._down_until = 0.0
+
+    def _checkout(self) -> Tuple[Tuple[socket.socket, Any], bool]:
+        with self._lock:
+            if self._idle:
+                return self._idle.pop(), True
+        sock = socket.create_connection(self.address, timeout=self.timeout)
+        return (sock, sock.makefile("rb")), False
+
+    def _checkin(self, conn: Tuple[socket.socket, Any]):
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(conn)
+                return
+        self._close(conn)
+
+    def _request(self, message: dict) -> Optional[dict]:
+        if time.monotonic() < self._down_until:
+            return None
+        message["ns"] = self.namespace
+        line = json.dumps(message, ensure_ascii=False).encode("utf-8") + b"\n"
+        while True:
+            try:
+                conn, reused = self._checkout()
+            except OSError:
+                self._down_until = time.monotonic() + self.retry_after
+                return None
+            try:
+                conn[0].sendall(line)
+                reply = conn[1].readline()
+                if not reply:
+                    raise ConnectionError("캐시 서버 연결이 끊어졌습니다.")
+                result = json.loads(reply)
+            except (OSError, ValueError):
+                self._close(conn)
+                # 쉬고 있던 연결이 서버 쪽에서 끊긴 경우에만 새 연결로 한 번 더 보낸다.
+                if reused:
+                    continue
+                self._down_until = time.monotonic() + self.retry_after
+                return None
+            self._checkin(conn)
+            return result
+
+    @staticmethod
+    def _close(conn: Tuple[socket.socket, Any]):
+        try:
+            conn[0].close()
+        except OSError:
+            pass
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        reply = self._request({"op": "get", "key": key})
+        if not reply or not reply.get("found"):
+            return default
+        return reply.get("value")
+
+    def get_many(self, keys: Sequence[Hashable], default: Any = None) -> List[Any]:
+        reply = self._request({"op": "mget", "keys": list(keys)})
+        if not reply or len(reply.get("found") or ()) != len(keys):
+            return [default] * len(keys)
+        return [value if found else default for found, value in zip(reply["found"], reply["values"])]
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> bool:
+        reply = self._request({"op": "set", "key": key, "value": value, "ttl": self.ttl if ttl is None else ttl})
+        if not reply or not reply.get("ok"):
+            SHARED_CACHE_DROPPED.inc(cache=self.namespace, reason="unavailable")
+            return False
+        return True
+
+    def delete(self, key: Hashable):
+        self._request({"op": "delete", "key": key})
+
+    def clear(self):
+        self._request({"op": "clear"})
+
+    async def aget(self, key: Hashable, default: Any = None) -> Any:
+        if time.monotonic() < self._down_until:
+            return default
+        return await asyncio.to_thread(self.get, key, default)
+
+    async def aget_many(self, keys: Sequence[Hashable], default: Any = None) -> List[Any]:
+        if time.monotonic() < self._down_until or not keys:
+            return [default] * len(keys)
+        return await asyncio.to_thread(self.get_many, keys, default)
+
+    async def aset(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        if time.monotonic() < self._down_until:
+            SHARED_CACHE_DROPPED.inc(cache=self.namespace, reason="unavailable")
+            return
+        await asyncio.to_thread(self.set, key, value, ttl)
+
+
+def make_cache(name: str, maxsize: int, ttl: Optional[float] = None, slot_size: Optional[int] = None):
+    backend = os.getenv("CACHE_BACKEND", "memory")
+    if backend == "mmap":
+        directory = os.getenv("CACHE_MMAP_DIR", os.path.join(os.getenv("CACHE_DIR", ".cache"), "shared"))
+        slot_size = slot_size or int(os.getenv("CACHE_MMAP_SLOT_BYTES", "2048"))
+        ways = 8
+        slots = max(1, -(-maxsize // ways)) * ways
+        # 크기 설정을 파일 이름에 넣어서, 설정이 바뀐 배포의 워커는 새 파일을 쓰고 이전 워커의 파일은 그대로 둔다.
+        path = os.path.join(directory, f"{name}-{slots}x{slot_size}x{ways}.mmap")
+        try:
+            return MmapCache(path, maxsize=maxsize, ttl=ttl, slot_size=slot_size, ways=ways, name=name)
+        except CacheGeometryMismatch as e:
+            print(f"[Cache] {e} 프로세스 메모리 캐시를 사용합니다.")
+            return MemoryCache(maxsize=maxsize, ttl=ttl)
+    if backend == "tcp":
+        return TcpCache(
+            os.getenv("CACHE_TCP_ADDRESS", "127.0.0.1:7379"),
+            namespace=name,
+            ttl=ttl,
+            timeout=float(os.getenv("CACHE_TCP_TIMEOUT", "0.2")),
+            retry_after=float(os.getenv("CACHE_TCP_RETRY_AFTER", "5")),
+        )
+    if backend != "memory":
+        raise ValueError(f"알 수 없는 CACHE_BACKEND: {backend} (memory, mmap, tcp 중 하나)")
+    return MemoryCache(maxsize=maxsize, ttl=ttl)
+
+
+async def serve(host: str, port: int, maxsize: int):
+    store = LRUCache(maxsize=maxsize)
+
+    def handle(message: dict) -> dict:
+        op = message.get("op")
+        key = _encode_key([message.get("ns"), message.get("key")])
+        if op == "get":
+            item = store.get(key)
+            return {"found": item is not None, "value": item[0] if item is not None else None}
+        if op == "mget":
+            items = [store.get(_encode_key([message.get("ns"), k])) for k in message.get("keys") or ()]
+            return {"found": [item is not None for item in items],
+                    "values": [item[0] if item is not None else None for item in items]}
+        if op == "set":
+            store.set(key, (message.get("value"),), ttl=message.get("ttl"))
+            return {"ok": True}
+        if op == "delete":
+            store.delete(key)
+            return {"ok": True}
+        if op == "clear":
+            store.clear()
+            return {"ok": True}
+        return {"error": f"unknown op: {op}"}
+
+    async def client(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    reply = handle(json.loads(line))
+                except ValueError as e:
+                    reply = {"error": str(e)}
+                writer.write(json.dumps(reply, ensure_ascii=False).encode("utf-8") + b"\n")
+                await writer.drain()
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(client, host, port)
+    print(f"[Cache] {host}:{port} 에서 대기 중 (최대 {maxsize}개)")
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="여러 서버가 함께 쓰는 캐시 서버를 띄웁니다.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    serve_parser = sub.add_parser("serve")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=7379)
+    serve_parser.add_argument("--maxsize", type=int, default=100000)
+    args = parser.parse_args()
+    asyncio.run(serve(args.host, args.port, args.maxsize))
+
+
+if __name__ == "__main__":
+    main()
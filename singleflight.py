@@ -0,0 +1,63 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, Optional, TypeVar
+
+from metrics import Counter, Gauge
+
+T = TypeVar("T")
+
+SINGLEFLIGHT_CALLS = Counter(
+    "plantmate_singleflight_calls_total",
+    "중복 제거 대상 호출 수 (leader=실제로 상류를 부른 호출, follower=진행 중인 호출에 합쳐진 호출)",
+    ("group", "role"),
+)
+SINGLEFLIGHT_IN_FLIGHT = Gauge("plantmate_singleflight_in_flight", "진행 중인 키 수", ("group",))
+
+
+# 같은 키로 동시에 들어온 호출을 하나로 합친다. 처음 호출한 쪽이 작업을 시작하고,
+# 나머지는 같은 Future 를 기다렸다가 같은 결과나 같은 예외를 받는다.
+# 작업은 별도 태스크로 돌기 때문에 기다리던 요청 하나가 취소돼도 다른 요청에는 영향이 없다.
+class SingleFlight:
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    def join(self, key: Hashable) -> Optional[asyncio.Future]:
+        future = self._calls.get(key)
+        if future is not None:
+            SINGLEFLIGHT_CALLS.inc(group=self.name, role="follower")
+        return future
+
+    def _register(self, key: Hashable, future: asyncio.Future):
+        SINGLEFLIGHT_CALLS.inc(group=self.name, role="leader")
+        SINGLEFLIGHT_IN_FLIGHT.inc(group=self.name)
+        self._calls[key] = future
+        future.add_done_callback(lambda f: self._forget(key, f))
+
+    def _forget(self, key: Hashable, future: asyncio.Future):
+        if self._calls.get(key) is future:
+            del self._calls[key]
+        SINGLEFLIGHT_IN_FLIGHT.dec(group=self.name)
+        # 기다리던 쪽이 모두 취소된 경우에도 "예외를 아무도 안 꺼냈다" 경고가 나지 않게 한다.
+        if not future.cancelled():
+            future.exception()
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        future = self.join(key)
+        if future is None:
+            future = asyncio.ensure_future(fn())
+            self._register(key, future)
+        return await asyncio.shield(future)
+
+    def lead(self, key: Hashable, timeout: Optional[float] = None) -> asyncio.Future:
+        # 결과를 호출자가 직접 채우는 경우(스트리밍 응답처럼 작업이 함수 하나로 끝나지 않을 때).
+        # timeout 안에 채워지지 않으면 취소해서 키가 영원히 묶이지 않게 한다.
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._register(key, future)
+        if timeout is not None:
+            handle = loop.call_later(timeout, future.cancel)
+            future.add_done_callback(lambda _: handle.cancel())
+        return future
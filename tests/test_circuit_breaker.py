@@ -0,0 +1,91 @@
+import asyncio
+
+import pytest
+
+from circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpen
+from openai_scheduler import Overloaded
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+async def _fail(breaker: CircuitBreaker, exc: Exception):
+    with pytest.raises(type(exc)):
+        async with breaker:
+            raise exc
+
+
+def test_local_shedding_does_not_open_breaker():
+    breaker = CircuitBreaker("openai", failure_threshold=2, ignore=(Overloaded,))
+
+    async def scenario():
+        for _ in range(5):
+            await _fail(breaker, Overloaded("busy", 1.0))
+        async with breaker:
+            pass
+
+    asyncio.run(scenario())
+    assert breaker.state == CLOSED
+
+
+def test_failures_open_and_probe_closes():
+    clock = FakeClock()
+    breaker = CircuitBreaker("openai", failure_threshold=2, reset_timeout=10, ignore=(Overloaded,), clock=clock)
+
+    async def scenario():
+        await _fail(breaker, RuntimeError("down"))
+        await _fail(breaker, RuntimeError("down"))
+        assert breaker.state == OPEN
+        with pytest.raises(CircuitOpen):
+            async with breaker:
+                pass
+        clock.now = 10
+        assert breaker.state == HALF_OPEN
+        # 무시할 예외는 시험 자리만 돌려주고 상태를 바꾸지 않는다.
+        await _fail(breaker, Overloaded("busy", 1.0))
+        assert breaker.state == HALF_OPEN
+        async with breaker:
+            pass
+
+    asyncio.run(scenario())
+    assert breaker.state == CLOSED
+
+
+def test_batch_records_one_outcome_per_request():
+    breaker = CircuitBreaker("openai", failure_threshold=2, ignore=(Overloaded,))
+
+    async def scenario():
+        batch = breaker.batch()
+        for _ in range(4):
+            await _fail(batch, RuntimeError("down"))
+        batch.close()
+        assert breaker.state == CLOSED
+
+        batch = breaker.batch()
+        await _fail(batch, RuntimeError("down"))
+        async with batch:
+            pass
+        batch.close()
+
+    asyncio.run(scenario())
+    assert breaker.state == CLOSED
+    assert breaker._failures == 0
+
+
+def test_is_failure_filters_client_errors():
+    breaker = CircuitBreaker("kakao", failure_threshold=2, is_failure=lambda e: "5xx" in str(e))
+
+    async def scenario():
+        for _ in range(5):
+            await _fail(breaker, RuntimeError("400 bad request"))
+        assert breaker.state == CLOSED
+        await _fail(breaker, RuntimeError("5xx"))
+        await _fail(breaker, RuntimeError("5xx"))
+
+    asyncio.run(scenario())
+    assert breaker.state == OPEN
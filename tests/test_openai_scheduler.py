@@ -0,0 +1,64 @@
+import asyncio
+
+from openai_scheduler import OpenAIScheduler
+
+
+def test_mixed_stream_and_completion_latency_keeps_limit():
+    # 스트리밍(헤더까지 ~0.4초)과 일반 호출(생성 끝까지 ~5초)이 섞여도 429 없이 한도가 줄면 안 된다.
+    scheduler = OpenAIScheduler(concurrency=8)
+    for i in range(50):
+        if i % 2:
+            scheduler._on_success("completion", 5.0)
+        else:
+            scheduler._on_success("stream", 0.4)
+    assert scheduler.limit >= 8
+
+
+def test_slow_class_still_reduces_limit():
+    scheduler = OpenAIScheduler(concurrency=8)
+    for _ in range(5):
+        scheduler._on_success("completion", 1.0)
+    for _ in range(20):
+        scheduler._on_success("completion", 10.0)
+    assert scheduler.limit < 8
+
+
+def test_rate_limit_halves_limit_once_per_response_time():
+    scheduler = OpenAIScheduler(concurrency=8)
+    scheduler._on_rate_limited()
+    scheduler._on_rate_limited()
+    assert scheduler.limit == 4
+
+
+def test_expected_wait_uses_slot_hold_time():
+    async def scenario():
+        scheduler = OpenAIScheduler(concurrency=1, tokens_per_minute=10**9)
+        async with scheduler.admit(1, kind="stream"):
+            await asyncio.sleep(0.05)
+        assert scheduler._hold_time >= 0.05
+        async with scheduler.admit(1):
+            assert scheduler._expected_wait(1) >= 0.05
+
+    asyncio.run(scenario())
+
+
+def test_shed_is_not_counted_as_openai_error():
+    from metrics import UPSTREAM_ERRORS
+    from openai_scheduler import Overloaded
+
+    async def scenario():
+        scheduler = OpenAIScheduler(concurrency=1, max_queue=0)
+
+        async def call():
+            return "ok"
+
+        before = UPSTREAM_ERRORS._values.get(("openai",), 0)
+        try:
+            await scheduler.call(call, 1)
+        except Overloaded:
+            pass
+        else:
+            raise AssertionError("대기열이 가득 차면 Overloaded 여야 한다")
+        assert UPSTREAM_ERRORS._values.get(("openai",), 0) == before
+
+    asyncio.run(scenario())
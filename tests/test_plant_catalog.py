@@ -0,0 +1,31 @@
+from plant_catalog import PlantCatalog
+
+PLANTS = [(1, "몬스테라"), (2, "아이비"), (3, "산세베리아"), (4, "스투키"), (5, "테이블야자"), (6, "아레카야자")]
+ALIASES = [(1, "Monstera"), (1, "몬스테라 델리시오사")]
+
+
+def _catalog() -> PlantCatalog:
+    return PlantCatalog(PLANTS, ALIASES)
+
+
+def test_exact_names_and_aliases():
+    catalog = _catalog()
+    assert catalog.resolve("몬스테라 (Monstera)") == 1
+    assert catalog.resolve("monstera") == 1
+    assert catalog.resolve("몬스테라 델리시오사") == 1
+
+
+def test_single_typo_resolves():
+    catalog = _catalog()
+    assert catalog.resolve("몬스테러") == 1
+    assert catalog.resolve("산세베리야") == 3
+    assert catalog.resolve("아레카야쟈") == 6
+
+
+def test_names_containing_another_plant_do_not_merge():
+    catalog = _catalog()
+    assert catalog.resolve("아이비제라늄") is None
+    assert catalog.resolve("스투키 산세베리아") is None
+    assert catalog.resolve("테이블") is None
+    assert catalog.resolve("야자") is None
+    assert catalog.key("아이비제라늄") != catalog.key("아이비")
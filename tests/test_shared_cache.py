@@ -0,0 +1,108 @@
+import asyncio
+import socket
+import time
+
+import pytest
+
+from metrics import render_latest
+from shared_cache import CacheGeometryMismatch, MmapCache, TcpCache, make_cache, serve
+
+
+def _cache(tmp_path, **kwargs) -> MmapCache:
+    return MmapCache(str(tmp_path / "test.mmap"), **kwargs)
+
+
+def test_mmap_roundtrip_and_sharing(tmp_path):
+    writer = _cache(tmp_path, maxsize=64)
+    reader = _cache(tmp_path, maxsize=64)
+    writer.set(("몬스테라", [3, "맑음"]), {"advice": "물을 주세요"})
+    assert reader.get(("몬스테라", [3, "맑음"])) == {"advice": "물을 주세요"}
+    assert reader.get("없는 키", "기본값") == "기본값"
+    reader.delete(("몬스테라", [3, "맑음"]))
+    assert writer.get(("몬스테라", [3, "맑음"])) is None
+
+
+def test_mmap_ttl(tmp_path):
+    cache = _cache(tmp_path, maxsize=16, ttl=0.05)
+    cache.set("a", 1)
+    cache.set("b", 2, ttl=60)
+    time.sleep(0.1)
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+
+
+def test_mmap_evicts_least_recently_used_in_bucket(tmp_path):
+    cache = _cache(tmp_path, maxsize=2, ways=2)
+    cache.set("a", 1)
+    time.sleep(0.01)
+    cache.set("b", 2)
+    time.sleep(0.01)
+    assert cache.get("a") == 1
+    time.sleep(0.01)
+    cache.set("c", 3)
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_mmap_counts_oversize_entries(tmp_path):
+    cache = _cache(tmp_path, maxsize=16, slot_size=256, name="oversize_test")
+    assert not cache.set("advice", "물" * 700)
+    assert cache.get("advice") is None
+    assert 'plantmate_shared_cache_dropped_total{cache="oversize_test",reason="oversize"} 1' in render_latest()
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def test_tcp_cache_roundtrip():
+    port = _free_port()
+
+    async def scenario():
+        server = asyncio.create_task(serve("127.0.0.1", port, maxsize=100))
+        await asyncio.sleep(0.1)
+        try:
+            cache = TcpCache(f"127.0.0.1:{port}", namespace="care", timeout=1.0)
+            await cache.aset(("몬스테라", 1), "물을 주세요")
+            assert await cache.aget(("몬스테라", 1)) == "물을 주세요"
+            assert await cache.aget_many([("몬스테라", 1), ("선인장", 1)], "없음") == ["물을 주세요", "없음"]
+        finally:
+            server.cancel()
+
+    asyncio.run(scenario())
+
+
+def test_tcp_cache_backs_off_when_server_is_down():
+    cache = TcpCache(f"127.0.0.1:{_free_port()}", namespace="care", timeout=0.2, retry_after=60)
+
+    async def scenario():
+        assert await cache.aget("a", "miss") == "miss"
+        started = time.monotonic()
+        for _ in range(100):
+            assert await cache.aget("a", "miss") == "miss"
+        return time.monotonic() - started
+
+    assert asyncio.run(scenario()) < 0.1
+
+
+def test_mmap_refuses_mismatched_geometry(tmp_path):
+    path = str(tmp_path / "test.mmap")
+    first = MmapCache(path, maxsize=4096)
+    first.set("a", 1)
+    with pytest.raises(CacheGeometryMismatch):
+        MmapCache(path, maxsize=64)
+    # 먼저 연 쪽의 매핑과 내용은 그대로 남아 있어야 한다.
+    assert first.get("a") == 1
+
+
+def test_make_cache_keeps_geometry_in_file_name(tmp_path, monkeypatch):
+    monkeypatch.setenv("CACHE_BACKEND", "mmap")
+    monkeypatch.setenv("CACHE_MMAP_DIR", str(tmp_path))
+    old = make_cache("geometry", maxsize=4096)
+    old.set("a", 1)
+    new = make_cache("geometry", maxsize=64)
+    assert isinstance(new, MmapCache) and new.path != old.path
+    assert old.get("a") == 1